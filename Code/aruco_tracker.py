@@ -3,844 +3,352 @@
 Author: Eswara prasad
 Domain: Signal Processing and ML
 Sub-domain: Image processing
-Functions: mean,mean_arr, add_velocity_values, max_area, drawCar, draw, compositeArray, idle, reshape, keyboard, main
-Global variables: windowWidth, windowHeight, dictionary, parameters, mtx, dist, alpha, beta, cx, cy, cap, seen_ids 
+Functions: load_calibration, ArucoTracker, main
+Global variables: CALIBRATION_FILE, PROFILE_EVERY
+
+Importing this module does not import OpenGL, open the camera or load the calibration.
+They are initialized the first time ArucoTracker needs them, so tools that only detect or track markers start quickly.
 """
 
-from OpenGL.GL import *
-from OpenGL.GLU import *
-from OpenGL.GLUT import *
 import cv2
 import cv2.aruco as aruco
 import numpy as np
 import traceback
+import os
 import sys
+import time
+import detector
+import tracker
+import pose
+import latency
 
-windowWidth = 800
-windowHeight = 600
-
-dictionary = aruco.Dictionary_get(aruco.DICT_ARUCO_ORIGINAL)
-parameters =  aruco.DetectorParameters_create()
-
-# Load camera parameter
-with np.load('../Data/camera_calibration.npz') as X:
-
-    mtx, dist, _, _ = [X[i] for i in ('mtx', 'dist', 'rvecs', 'tvecs')]
-    # mtx --> Camera matrix representing [[fx, 0, cx],
-    #									  [0, fy, cy],
-    #                                     [0, 0, p]], 
-    #		  where fx = focal length in x direction
-    #		        fy = focal length in y direction
-    #		        cx = X center of camera
-    #		        cy = Y center of camera
-
-    # dist --> Radial distortion matrix
-  
-alpha = mtx[0,0]
-beta = mtx[1,1]
-cx = mtx[0,2]
-cy = mtx[1,2]
-
-"""
-Function Name: mean
-Output: Return the mean of a list
-Logic: Sum of values divided the number of elements
-Example Call: mean = mean(arr)
-"""
-    
-def mean(arr):
-    return sum(arr)/float(len(arr))
-
-"""
-Function Name: mean_arr(arr)
-Output: Returns the mean of list of vertices of quadrilateral (ie. list of tuples) as a tuple
-Logic: Calls mean(arr) for list of tuples
-Example Call: average = mean_arr(arr)
-"""
-
-def mean_arr(arr):
-
-    return (mean(arr[:,0]),mean(arr[:,1]))
-    # Traversing through x and y of each vertex and calling mean of the obtained list
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data', 'camera_calibration.npz')
+PROFILE_EVERY = 300 # Frames between GL call count reports when profile_gl is set
 
 """
-Function Name: add_velocity_values
-Output: Adds present velocity to saved list and computes average velocity of each vertex
-Logic: Calls mean_arr for each vertex (list of tuples)
-Example Call: add_velocity_values(saved_velocities, values, average_velocity)
+Function name: load_calibration
+Output: Returns the camera matrix and distortion coefficients
+Input: Path of the calibration npz file
+Example call: mtx, dist = load_calibration(CALIBRATION_FILE)
 """
 
-def add_velocity_values(saved, values, average):
-    values = np.float32([values])
-    if(len(saved) <= 50):
-        saved = np.concatenate((saved, values)) # Saves velocities for 50 frames
-    if(len(saved) > 50):
-        saved = saved[1:] # If more than 50 values are stored pop first element to make the length 50 again
+def load_calibration(path = CALIBRATION_FILE):
+    # Load camera parameter
+    with np.load(path) as X:
 
-    for i in range(4):
-        average[i] = mean_arr(saved[:,i])
-        # First obtain list of each vertex in saved list eg. saved[:,2] returns the list of third vertex coordinates 
+        mtx, dist = [X[i] for i in ('mtx', 'dist')]
+        # mtx --> Camera matrix representing [[fx, 0, cx],
+        #                                     [0, fy, cy],
+        #                                     [0, 0, p]],
+        #         where fx = focal length in x direction
+        #               fy = focal length in y direction
+        #               cx = X center of camera
+        #               cy = Y center of camera
 
-"""
-Function name: max_area
-Output: Returns the area of maximum bounding rectangle of a quadrilateral
-Input: Vertices of quadrilateral
-Logic: Area is product of difference of width and height
-Example call: area = max_area(quad)
-"""
+        # dist --> Radial distortion matrix
 
-def max_area(quad):
-    quad = np.float32(quad)
-    return ((max(quad[:,0]) - min(quad[:,0])) * (max(quad[:,1]) - min(quad[:, 1])))        
+    return mtx, dist
 
 """
-Function name: drawCar
-Output: Draws the car in 3d using OpenGL functions
-Logic: Draws using glBegin() and glEnd()
-Example call: drawCar()
+Class Name: ArucoTracker
+Logic: Holds the state of the tracker. The camera, calibration, dictionary and detector parameters are created on first use
+       and OpenGL is only imported by run(). detect() and tracks can be used without a window.
+Parameters: source --> Camera index or video file passed to cv2.VideoCapture
+            profile --> Detector profile (see detector.DETECTOR_PROFILES). None uses detector.DEFAULT_PROFILE when the parameters are created
+            allowed_ids --> Marker IDs to track. None uses detector.ALLOWED_IDS at every frame (itself None for all)
+            calibration_file --> Path of the calibration npz file
+            parallel_pose_from --> Solve the poses on a thread pool when at least this many markers are drawn. None (default) always
+                                   solves serially. Run bench_pose.py to find the crossover (see pose.PoseSolver)
+            compensate_latency --> Draw each car where its marker is expected to be when the frame is displayed (see latency.LatencyCompensator)
+            capture_delay --> Seconds from exposure to cap.read() returning, used when the camera gives no frame timestamp
+            display_delay --> Seconds from the buffer swap to the image on screen
+            cache_gl_state --> Draw with render_state.RenderState instead of the immediate mode functions of renderer. 'g' switches while running
+            profile_gl --> Count GL calls per frame and print the counts of both drawing paths every PROFILE_EVERY frames
+            tile_size --> Detect on overlapping tiles of this side (pixels) in parallel, for very high resolution cameras. None detects on the whole frame
+            max_marker_size --> Largest width or height of a marker in the frame (pixels), the overlap of the tiles
+            tile_workers --> Threads the tiles are detected on. Run bench_tiles.py before raising it from 1
+            max_age, max_tracks, draw_confidence --> Lifecycle of the tracks (see tracker.TrackManager)
+Example Call: app = ArucoTracker(0, 'fast'); app.run()
 """
 
-def drawCar():
-	z = 1.5
-    
-	# Back window frame    
-	glColor3f(206/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 0.25, -z)
-	glVertex3f(-3.0, 0.25, z)
-	glVertex3f(-3.0, -1.0, z)
-	glVertex3f(-3.0, -1.0, -z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.5, -z)
-	glVertex3f(-3.0, 1.5, z)
-	glVertex3f(-3.0, 1.0, z)
-	glVertex3f(-3.0, 1.0, -z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 0.25, -z)
-	glVertex3f(-3.0, 0.25, -z+0.5)
-	glVertex3f(-3.0, 1.0, -z+0.5)
-	glVertex3f(-3.0, 1.0, -z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 0.25, z-0.5)
-	glVertex3f(-3.0, 0.25, z)
-	glVertex3f(-3.0, 1.0, z)
-	glVertex3f(-3.0, 1.0, z-0.5)
-	glEnd()
-
-	# Top
-	glColor3f(240/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.5, -z)
-	glVertex3f(-3.0, 1.5, z)
-	glVertex3f(0.6, 1.5, z)
-	glVertex3f(0.6, 1.5, -z)
-	glEnd()
-
-	# Bottom
-	glColor3f(190/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, -1.0, -z)
-	glVertex3f(-3.0, -1.0, z)
-	glVertex3f(3.0, -1.0, z)
-	glVertex3f(3.0, -1.0, -z)
-	glEnd()
-
-	# Front
-	glColor3f(206/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(3.0, -1.0, -z)
-	glVertex3f(3.0, 0.15, -z)
-	glVertex3f(3.0, 0.15, z)
-	glVertex3f(3.0, -1.0, z)
-
-	# Lamp
-	glColor3f(0.9,0.9,0.9)
-	glVertex3f(3.006, -0.65, -z+0.101)
-	glVertex3f(3.006, -0.35, -z+0.101)
-	glVertex3f(3.006, -0.35, -z+0.601)
-	glVertex3f(3.006, -0.65, -z+0.601)
-
-	glVertex3f(3.006, -0.65, z-0.101)
-	glVertex3f(3.006, -0.35, z-0.101)
-	glVertex3f(3.006, -0.35, z-0.601)
-	glVertex3f(3.006, -0.65, z-0.601)
-
-	glColor3f(0,0,0)
-	glVertex3f(3.006, -0.6, -z+1)
-	glVertex3f(3.006, -0.37, -z+1)
-	glVertex3f(3.006, -0.37, z-1)
-	glVertex3f(3.006, -0.6, z-1)
-	
-	# Lamp2
-	glColor3f(0.6,0.6,0.6)
-	glVertex3f(3.005, -0.7, -z)
-	glVertex3f(3.005, -0.3, -z)
-	glVertex3f(3.005, -0.3, z)
-	glVertex3f(3.005, -0.7, z)
-
-	glVertex3f(2.9, -0.3, -z-0.0014)
-	glVertex3f(3.0, -0.3, -z-0.0014)
-	glVertex3f(3.0, -0.7, -z-0.0014)
-	glVertex3f(2.9, -0.7, -z-0.0014)
-
-	glVertex3f(2.9, -0.3, z+0.0014)
-	glVertex3f(3.0, -0.3, z+0.0014)
-	glVertex3f(3.0, -0.7, z+0.0014)
-	glVertex3f(2.9, -0.7, z+0.0014)
-	
-	glColor3f(226/255, 152/255, 22/255)
-	glVertex3f(2.95, -0.35, z+0.0015)
-	glVertex3f(2.985, -0.35, z+0.0015)
-	glVertex3f(2.985, -0.65, z+0.0015)
-	glVertex3f(2.95, -0.65, z+0.0015)
-
-	glVertex3f(2.95, -0.35, -z-0.0015)
-	glVertex3f(2.985, -0.35, -z-0.0015)
-	glVertex3f(2.985, -0.65, -z-0.0015)
-	glVertex3f(2.95, -0.65, -z-0.0015)
-	glEnd()
-
-	# Front cover
-	glColor3f(230/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(3.0, 0.15, -z)
-	glVertex3f(1.2, 0.25, -z)
-	glVertex3f(1.2, 0.25, z)
-	glVertex3f(3.0, 0.15, z)
-	glEnd()
-
-	# Front window frame
-	glColor3f(235/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(0.6, 1.5, -z)
-	glVertex3f(0.6, 1.5, z)
-	glVertex3f(0.65, 1.42, z)
-	glVertex3f(0.65, 1.42, -z)
-
-	glVertex3f(1.15, 0.34, -z)
-	glVertex3f(1.15, 0.34, -z+0.1)
-	glVertex3f(0.65, 1.42, -z+0.1)
-	glVertex3f(0.65, 1.42, -z)
-
-	glVertex3f(1.15, 0.34, z)
-	glVertex3f(1.15, 0.34, z-0.1)
-	glVertex3f(0.65, 1.42, z-0.1)
-	glVertex3f(0.65, 1.42, z)
-
-	glVertex3f(1.15, 0.34, -z)
-	glVertex3f(1.15, 0.34, z)
-	glVertex3f(1.2, 0.25, z)
-	glVertex3f(1.2, 0.25, -z)
-	glEnd()
-
-	# Left above (window frame part)
-	glColor3f(206/255, 20/255, 55/255)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.5, -z)
-	glVertex3f(0.6, 1.5, -z)
-	glVertex3f(0.696, 1.3, -z)
-	glVertex3f(-3.0, 1.3, -z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.3, -z)
-	glVertex3f(-3.0, 0.25, -z)
-	glVertex3f(-2.5, 0.25, -z)
-	glVertex3f(-2.5, 1.3, -z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-1.2, 1.3, -z)
-	glVertex3f(-1.2, 0.25, -z)
-	glVertex3f(-1.0, 0.25, -z)
-	glVertex3f(-1.0, 1.3, -z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(1.2, 0.25, -z)
-	glVertex3f(0.696, 1.3, -z)
-	glVertex3f(0.496, 1.3, -z)
-	glVertex3f(1.0, 0.25, -z)
-	glEnd()
-
-	# Left front door
-	glBegin(GL_POLYGON)
-	glVertex3f(1.2, 0.25, -z)
-	glVertex3f(3.0, 0.15, -z)
-	glVertex3f(3.0, -1.0, -z)
-	glVertex3f(1.2, -1.0, -z)
-	glEnd()
-
-	# Left back door
-	glBegin(GL_POLYGON)
-	glVertex3f(1.2, 0.25, -z)
-	glVertex3f(1.2, -1.0, -z)
-	glVertex3f(-3.0, -1.0, -z)
-	glVertex3f(-3.0, 0.25, -z)
-	glEnd()
-
-	# Right back door
-	glBegin(GL_POLYGON)
-	glVertex3f(1.2, 0.25, z)
-	glVertex3f(1.2, -1.0, z)
-	glVertex3f(-3.0, -1.0, z)
-	glVertex3f(-3.0, 0.25, z)
-	glEnd()
-
-	# Right front door
-	glBegin(GL_POLYGON)
-	glVertex3f(1.2, 0.25, z)
-	glVertex3f(3.0, 0.15, z)
-	glVertex3f(3.0, -1.0, z)
-	glVertex3f(1.2, -1.0, z)
-	glEnd()
-
-	# Right above (window frame part)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.5, z)
-	glVertex3f(0.6, 1.5, z)
-	glVertex3f(0.696, 1.3, z)
-	glVertex3f(-3.0, 1.3, z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.3, z)
-	glVertex3f(-3.0, 0.25, z)
-	glVertex3f(-2.5, 0.25, z)
-	glVertex3f(-2.5, 1.3, z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(-1.2, 1.3, z)
-	glVertex3f(-1.2, 0.25, z)
-	glVertex3f(-1.0, 0.25, z)
-	glVertex3f(-1.0, 1.3, z)
-	glEnd()
-
-	glBegin(GL_QUADS)
-	glVertex3f(1.2, 0.25, z)
-	glVertex3f(0.696, 1.3, z)
-	glVertex3f(0.496, 1.3, z)
-	glVertex3f(1.0, 0.25, z)
-	glEnd()
-
-	# Side bottom
-	glColor3f(165/255, 8/255, 37/255)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, -0.3, -z-0.0013)
-	glVertex3f(3.0, -0.3, -z-0.0013)
-	glVertex3f(3.0, -0.7, -z-0.0013)
-	glVertex3f(-3.0, -0.7, -z-0.0013)
-
-	glVertex3f(-3.0, -0.3, z+0.0013)
-	glVertex3f(3.0, -0.3, z+0.0013)
-	glVertex3f(3.0, -0.7, z+0.0013)
-	glVertex3f(-3.0, -0.7, z+0.0013)
-	glEnd()
-
-	# Left mirror
-	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-	glEnable(GL_BLEND)
-	glColor4f(190/255, 190/255, 190/255, 0.6)
-	glBegin(GL_QUADS)
-	glVertex3f(0.85, 0.5, -z-0.4)
-	glVertex3f(0.85, 0.5, -z)
-	glVertex3f(0.85, 0.25, -z)
-	glVertex3f(0.85, 0.25, -z-0.4)
-	glEnd()
-	glDisable(GL_BLEND)
-
-	glColor3f(180/255, 30/255, 30/255)
-	glBegin(GL_QUADS)
-	glVertex3f(0.85, 0.5, -z-0.4)
-	glVertex3f(1, 0.5, -z-0.4)
-	glVertex3f(1, 0.25, -z-0.4)
-	glVertex3f(0.85, 0.25, -z-0.4)
-
-	glVertex3f(0.85, 0.5, -z-0.4)
-	glVertex3f(0.85, 0.5, -z)
-	glVertex3f(1, 0.5, -z)
-	glVertex3f(1, 0.5, -z-0.4)
-
-	glVertex3f(1, 0.5, -z-0.4)
-	glVertex3f(1, 0.5, -z)
-	glVertex3f(1, 0.25, -z)
-	glVertex3f(1, 0.25, -z-0.4)
-
-	glVertex3f(0.85, 0.5, -z)
-	glVertex3f(1, 0.5, -z)
-	glVertex3f(1, 0.25, -z)
-	glVertex3f(0.85, 0.25, -z)
-
-	glVertex3f(0.85, 0.25, -z-0.4)
-	glVertex3f(0.85, 0.25, -z)
-	glVertex3f(1, 0.25, -z)
-	glVertex3f(1, 0.25, -z-0.4)
-
-	glEnd()
-
-	# Right mirror
-	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-	glEnable(GL_BLEND)
-	glColor4f(190/255, 190/255, 190/255, 0.6)
-	glBegin(GL_QUADS)
-	glVertex3f(0.85, 0.5, z+0.4)
-	glVertex3f(0.85, 0.5, z)
-	glVertex3f(0.85, 0.25, z)
-	glVertex3f(0.85, 0.25, z+0.4)
-	glEnd()
-	glDisable(GL_BLEND)
-
-	glColor3f(180/255, 30/255, 30/255)
-	glBegin(GL_QUADS)
-	glVertex3f(0.85, 0.5, z+0.4)
-	glVertex3f(1, 0.5, z+0.4)
-	glVertex3f(1, 0.25, z+0.4)
-	glVertex3f(0.85, 0.25, z+0.4)
-
-	glVertex3f(1, 0.5, z+0.4)
-	glVertex3f(1, 0.5, z)
-	glVertex3f(1, 0.25, z)
-	glVertex3f(1, 0.25, z+0.4)
-
-	glVertex3f(0.85, 0.5, z+0.4)
-	glVertex3f(0.85, 0.5, z)
-	glVertex3f(1, 0.5, z)
-	glVertex3f(1, 0.5, z+0.4)
-
-	glVertex3f(0.85, 0.5, z)
-	glVertex3f(1, 0.5, z)
-	glVertex3f(1, 0.25, z)
-	glVertex3f(0.85, 0.25, z)
-
-	glVertex3f(0.85, 0.25, z+0.4)
-	glVertex3f(0.85, 0.25, z)
-	glVertex3f(1, 0.25, z)
-	glVertex3f(1, 0.25, z+0.4)
-	glEnd()
-
-	# Left window glass
-	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-	glEnable(GL_BLEND)
-	glColor4f(90/255, 90/255, 90/255, 0.3)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.5, -z+0.01)
-	glVertex3f(0.5, 1.5, -z+0.01)
-	glVertex3f(1.2, 0.25, -z+0.01)
-	glVertex3f(-3.0, 0.25, -z+0.01)
-	glEnd()
-	glDisable(GL_BLEND)
-	
-	# Right window glass
-	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-	glEnable(GL_BLEND)
-	glColor4f(90/255, 90/255, 90/255, 0.3)
-	glBegin(GL_QUADS)
-	glVertex3f(-3.0, 1.5, z-0.01)
-	glVertex3f(0.5, 1.5, z-0.01)
-	glVertex3f(1.2, 0.25, z-0.01)
-	glVertex3f(-3.0, 0.25, z-0.01)
-	glEnd()
-	glDisable(GL_BLEND)
-
-	# Front window glass
-	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-	glEnable(GL_BLEND)
-	glColor4f(90/255, 90/255, 90/255, 0.3)
-	glBegin(GL_QUADS)
-	glVertex3f(0.5, 1.5, -z)
-	glVertex3f(0.5, 1.5, z)
-	glVertex3f(1.2, 0.25, z)
-	glVertex3f(1.2, 0.25, -z)
-	glEnd()
-	glDisable(GL_BLEND)
-
-	#back window glass
-	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-	glEnable(GL_BLEND)
-	glColor4f(90/255, 90/255, 90/255, 0.3)
-	glBegin(GL_QUADS)
-	glVertex3f(-2.99, 0.25, -z+0.5)
-	glVertex3f(-2.99, 0.25, z-0.5)
-	glVertex3f(-2.99, 1.0, z-0.5)
-	glVertex3f(-2.99, 1.0, -z+0.5)
-	glEnd()
-	glDisable(GL_BLEND)
-
-	# Car's Wheel
-	glColor3f(0.0, 0.0, 0.0)
-	quadric = gluNewQuadric()
-	gluQuadricNormals(quadric, GLU_SMOOTH)
-	gluQuadricTexture(quadric, GL_TRUE)
-	glTranslatef(1.7,-1.0,-1.7)
-	gluCylinder(quadric,0.6,0.6,0.2,15,15)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	glTranslatef(0.0,0.0,0.2)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	
-	glTranslatef(0.0, 0.0, -0.2)
-	glTranslatef(-3.3, 0.0, 0.0)
-	gluCylinder(quadric,0.6,0.6,0.2,15,15)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	glTranslatef(0.0,0.0,0.2)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	
-	glTranslatef(0.0, 0.0, -0.2)
-	glTranslatef(0.0, 0.0, 3.2)
-	gluCylinder(quadric,0.6,0.6,0.2,15,15)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	glTranslatef(0.0,0.0,0.2)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	
-	glTranslatef(0.0, 0.0, -0.2)
-	glTranslatef(3.3, 0.0, 0.0)
-	gluCylinder(quadric,0.6,0.6,0.2,15,15)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	glTranslatef(0.0,0.0,0.2)
-	gluDisk(quadric, 0, 0.6, 15, 15)
-	
-	glColor3f(1.0, 1.0, 1.0)
-	gluDisk(quadric, 0.2, 0.4, 15, 15)
-	glTranslatef(-3.3, 0.0, 0.0)
-	gluDisk(quadric, 0.2, 0.4, 15, 15)
-	glTranslatef(0.0, 0.0, -0.2)
-	glTranslatef(0.0, 0.0, -3.2)
-	gluDisk(quadric, 0.2, 0.4, 15, 15)
-	glTranslatef(+3.3, 0.0, 0.0)
-	gluDisk(quadric, 0.2, 0.4, 15, 15)    
+class ArucoTracker:
+
+    def __init__(self,
+                 # Input and detection
+                 source = 0, profile = None, allowed_ids = None, calibration_file = CALIBRATION_FILE,
+                 # Pose and latency
+                 parallel_pose_from = pose.PARALLEL_MIN_MARKERS,
+                 compensate_latency = False, capture_delay = latency.CAPTURE_DELAY, display_delay = latency.DISPLAY_DELAY,
+                 # Rendering
+                 cache_gl_state = True, profile_gl = False,
+                 # Tiled detection
+                 tile_size = None, max_marker_size = detector.MAX_MARKER_SIZE, tile_workers = detector.TILE_WORKERS,
+                 # Tracks
+                 max_age = tracker.MAX_AGE, max_tracks = tracker.MAX_TRACKS, draw_confidence = tracker.DRAW_CONFIDENCE):
+        self.source = source
+        self.profile = profile
+        self.allowed_ids = allowed_ids
+        self.calibration_file = calibration_file
+
+        # Tiled detection is only used if a tile size is given
+        self.tiles = None if tile_size is None else detector.TiledDetector(tile_size, max_marker_size, tile_workers)
+
+        # Tracks of markers seen so far. A shorter velocity average is used when poses are extrapolated
+        history = latency.VELOCITY_HISTORY if compensate_latency else tracker.MAX_SAVED_VELOCITIES
+        self.tracks = tracker.TrackManager(max_age = max_age, max_tracks = max_tracks, draw_confidence = draw_confidence, history = history)
+
+        # Poses of all drawn markers are solved together, on a thread pool only if parallel_pose_from is given
+        self.poses = pose.PoseSolver(min_markers = parallel_pose_from)
+
+        # Capture to display latency is always measured. Poses are extrapolated with it only if compensate_latency is set
+        self.latency = latency.LatencyCompensator(capture_delay, display_delay)
+        self.compensate_latency = compensate_latency
+
+        self._cap = None
+        self._calibration = None
+        self._dictionary = None
+        self._parameters = None
+
+        # GL modules and state are only set by run()
+        self.renderer = None
+        self.state = None
+        self.cache_gl_state = cache_gl_state
+        self.profile_gl = profile_gl
+        self.gl_counter = None
+        self.window_size = None # Set by run() and reshape()
+
+    @property
+    def cap(self):
+        if self._cap is None:
+            # Start capturing video
+            self._cap = cv2.VideoCapture(self.source)
+        return self._cap
+
+    @property
+    def calibration(self):
+        if self._calibration is None:
+            self._calibration = load_calibration(self.calibration_file)
+        return self._calibration
+
+    @property
+    def dictionary(self):
+        if self._dictionary is None:
+            self._dictionary = aruco.Dictionary_get(aruco.DICT_ARUCO_ORIGINAL)
+        return self._dictionary
+
+    @property
+    def parameters(self):
+        if self._parameters is None:
+            self._parameters = detector.make_parameters(self.profile)
+        return self._parameters
+
+    """
+    Function Name: detect
+    Output: Returns corners, vertices (N x 4 x 2) and flattened ids of the markers in the image. ids is None if nothing is found
+    Input: BGR image
+    Example Call: corners, markers, ids = app.detect(img)
+    """
+
+    def detect(self, img):
+        if self.tiles is None:
+            corners, ids = detector.detect(img, self.dictionary, self.parameters, self.allowed_ids)
+        else:
+            corners, ids = self.tiles.detect(img, self.dictionary, self.parameters, self.allowed_ids)
+            # Corners are already in full frame coordinates and markers found in two tiles are merged
+
+        markers = np.float32(corners).reshape(-1,4,2)
+        # Reshape to arrays containing four vertices with two elements (x and y coordinates)
+
+        if not ids is None:
+            ids = ids.ravel()
+
+        return corners, markers, ids
+
+    """
+    Function Name: draw
+    Output: Draws the captured frame and car onto the screen. In PyOpenGL it is called as glutDisplayFunc(app.draw)
+    Logic: Tracks Aruco using OpenCV aruco library. It is projected onto window and a car is drawn for each marker using the display list picked by renderer.car_lod()
+    Example Call: app.draw()
+    """
+
+    def draw(self):
+        renderer = self.renderer
+        mtx, dist = self.calibration
+
+        # Aruco
+        ret, img = self.cap.read()
+        if not ret:
+            return
+
+        # Capture time from the camera's frame timestamp if it has one, else estimated from capture_delay
+        t_capture = self.latency.capture_time(time.monotonic(), self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+        self.latency.captured(t_capture)
+
+        corners, markers, ids = self.detect(img)
+
+        # Update the tracks of detected markers. Vertices of undetected markers are estimated from their average velocity
+        self.tracks.update(markers, ids)
+
+        img = cv2.cvtColor(img,cv2.COLOR_BGR2RGB) #BGR-->RGB
+        h, w = img.shape[:2]
+
+        # Markers to draw as (vertices, average velocity): every detection, even with a repeated ID or more markers than tracks,
+        # and the undetected tracks whose position we estimate ourselves. Tracks whose estimated position left the image are not drawn.
+        still = np.zeros((4,2), dtype=np.float32)
+        drawn = [] if ids is None else [(marker, self.tracks[m_id]['av_velocity'] if m_id in self.tracks else still) for (marker, m_id) in zip(markers, ids)]
+        drawn += [(marker_details['vertices'], marker_details['av_velocity']) for (m_id, marker_details) in self.tracks.predicted(w, h)]
+
+        # Move each marker by its average velocity to where it will be when this frame is displayed
+        lead = self.latency.lead() if self.compensate_latency else 0.0
+        quads = [latency.extrapolate(vertices, velocity, lead) for (vertices, velocity) in drawn]
+
+        cars = []
+        visible = []
+        for quad in quads:
+            car = renderer.car_lod(quad, w, h, *self.window_size)
+            if car is not None: # Skip markers too small or out of view
+                cars.append(car)
+                visible.append(quad)
+
+        # Either the cached state path or the immediate mode functions of renderer
+        frame = self.state if self.cache_gl_state else renderer
+        if self.cache_gl_state:
+            self.state.begin_frame(img)
+        else:
+            renderer.begin_frame(img, mtx[0,0], mtx[1,1], mtx[0,2], mtx[1,2])
 
-"""
-Function name: draw
-Output: Draws the captured frame and car onto the screen. In PyOpenGL it is called as glutDisplayFunc(draw)
-Logic: Tracks Aruco using OpenCV aruco library. It is projected onto window and a car is drawn using OpenGL by calling drawCar()
-Example call: draw()
-"""
-    
-def draw():    
-    # Aruco
-    ret, img = cap.read()
-    if not ret:
-        return
-    
-    corners, ids, rejectedImgPoints = aruco.detectMarkers(img, dictionary, parameters = parameters)
-    rvecs, tvecs, _ = aruco.estimatePoseSingleMarkers(corners, 8.0, mtx, dist)
-    
-    markers = np.float32(corners).reshape(-1,4,2)
-    # Reshape to arrays containing four vertices with two elements (x and y coordinates)
-    
-    global seen_ids             
-    
-    if not ids is None:
-        
-        ids = ids.ravel()               
-        
-        for i in range(len(ids)):
-            
-            marker = markers[i]
-            m_id = ids[i]                
-            
-            if m_id not in seen_ids:
-                seen_ids[m_id] = {'vertices':marker, 'av_velocity':np.float32([(0, 0),(0, 0),(0, 0),(0, 0)]), 'saved_velocities':np.zeros((0,4,2),dtype=np.float32), 'seen':True, 't':0}
-                # If the Marker ID is seen for the first time or again after a specific time, it is added to seen_ids.
-                # Here t denotes the time it is unseen. It is 0 as long as it is seen
-
-            else:
-                marker_details = seen_ids[m_id]
-                if(len(marker_details['saved_velocities']) > 0):
-                    prev_velocity = marker_details['saved_velocities'][-1]
-
-                else:
-                    prev_velocity = marker_details['av_velocity']
-                    # Initially previous velocity is average velocity ie. full of zeros
-                
-                new_velocity = []
-                # Present velocity is new velocity
-                
-                for i in range(4):
-                    vx = marker[i][0] - prev_velocity[i][0] # Velocity is present value of x or y minus the previous velocity
-                    vy = marker[i][1] - prev_velocity[i][1]
-                    
-                    if(vx > 40 or vy > 40):
-                        # If the velocity is too high (shaky) replace it with average velocity
-                        new_velocity = marker_details['av_velocity']
-                        break
-                    
-                    new_velocity.append((vx, vy))
-                    # Add computed velocity to new velocity
-                
-                new_velocity = np.float32(new_velocity)
-                add_velocity_values(marker_details['saved_velocities'],new_velocity, marker_details['av_velocity'])
-                # Calls add_velocity_values for saving current velocity and computing average velocity
-
-                marker_details['vertices'] = marker
-                marker_details['seen'] = True
-                marker_details['t'] = 0            
-          
-        
-    img= cv2.cvtColor(img,cv2.COLOR_BGR2RGB) #BGR-->RGB
-    h, w = img.shape[:2]
-    
-    # This draws the 2d projected on the screen
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img)
-    
-    # Enable / Disable
-    glDisable(GL_DEPTH_TEST)    # Disable GL_DEPTH_TEST
-    glDisable(GL_LIGHTING)      # Disable Light
-    glDisable(GL_LIGHT0)        # Disable Light
-    glEnable(GL_TEXTURE_2D)     # Enable texture map
-    
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)  # Clear Buffer
-    glColor3f(1.0, 1.0, 1.0)    # Set texture Color(RGB: 0.0 ~ 1.0)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    
-    glMatrixMode(GL_PROJECTION)
-    glLoadIdentity()
-    glPushMatrix()
-
-    glBegin(GL_QUADS)
-    
-    glTexCoord2d(0.0, 1.0)
-    glVertex3d(-1.0, -1.0,  0)
-    glTexCoord2d(1.0, 1.0)
-    glVertex3d( 1.0, -1.0,  0)
-    glTexCoord2d(1.0, 0.0)
-    glVertex3d( 1.0,  1.0,  0)
-    glTexCoord2d(0.0, 0.0)
-    glVertex3d(-1.0,  1.0,  0)
-    
-    glEnd()
-
-    glPopMatrix()
-    
-    # Enable / Disable
-    glEnable(GL_DEPTH_TEST)     # Enable GL_DEPTH_TEST
-    glEnable(GL_LIGHTING)       # Enable Light
-    glEnable(GL_LIGHT0)         # Enable Light
-    glDisable(GL_TEXTURE_2D)    # Disable texture map
-    glEnable(GL_COLOR_MATERIAL)
-
-    f = 1000.0  #far
-    n = 1.0     #near
-
-    ## Make projection matrix
-
-    m1 = np.array([
-    [(alpha)/cx, 0, 0, 0],
-    [0, beta/cy, 0, 0],
-    [0, 0, -(f+n)/(f-n), (-2.0*f*n)/(f-n)],
-    [0,0,-1,0],
-    ])
-    glLoadMatrixd(m1.T)
-
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-
-    # Push Projection of frame
-    glPushMatrix()
-    
-    glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.0,0.0,1.0,1.0])
-    # GL_FRONT_AND_BACK --> Specifies both front and back faces are updated
-    
-    if ids is not None:    
-        for i in range(len(ids)):
-            
-            tvec = tvecs[i]
-            rvec = rvecs[i]
-            
-            # fix axis
-            tvec[0,0] = tvec[0,0]
-            tvec[0,1] = -tvec[0,1]
-            tvec[0,2] = -tvec[0,2]
-        
-            rvec[0,1] = -rvec[0,1]
-            rvec[0,2] = rvec[0,2]
-            
-            try:
-                m = compositeArray(cv2.Rodrigues(rvec)[0], tvec[0]) # Rodrigues converts rotation matrix to rotation vector.
-                
-                glPushMatrix()
-                glLoadMatrixd(m.T)
-                glRotatef(180,0,0,1)
-                
-                glTranslatef(0,0,0)
-
-                # Draws the car
-                drawCar()
-                
-                glPopMatrix()
-                
-            except Exception as e:
-                print(e)
-    
-    # Filter seen_ids: If time unseen is greater than time for 100 frames, remove it.
-    seen_ids = {key:value for (key,value) in seen_ids.items() if value['t'] < 100}
-
-    # Find the Aruco markers undetected by Aruco dictionary and estimate their position ourselves.
-    undetected = (seen_ids[m_id] for m_id in seen_ids if not seen_ids[m_id]['seen'])
-    
-    for marker_details in undetected:
-    	# Estimate its pose from previous or calculated vertices
-        rvec, tvec, _ = aruco.estimatePoseSingleMarkers([np.array([marker_details['vertices']])], 8.0, mtx, dist)
-        rvec = rvec[0]
-        tvec = tvec[0]
-        
-        # Fix axis
-        tvec[0,0] = tvec[0,0]
-        tvec[0,1] = -tvec[0,1]
-        tvec[0,2] = -tvec[0,2]
-       
-        rvec[0,1] = -rvec[0,1]
-        rvec[0,2] = rvec[0,2]
-        
         try:
-            m = compositeArray(cv2.Rodrigues(rvec)[0], tvec[0]) # Rodrigues converts rotation matrix to rotation vector.
-            
-            glPushMatrix()
-            glLoadMatrixd(m.T)
-            glRotatef(180,0,0,1)
-            
-            glTranslatef(0,0,0)
-
-            # Draws the Car
-            drawCar()
-            
-            glPopMatrix()
-            
+            matrices = self.poses.solve(visible, mtx, dist)
         except Exception as e:
             print(e)
-            
-    for m_id in seen_ids:
-        marker_details = seen_ids[m_id]
-        
-        if not marker_details['seen']:
-        	# Increase time a marker is unseen for each frame it is unseen
-            marker_details['t'] += 1    
-
-            # Estimate the position of vertices using its previous vertices and average velocity                
-            marker_details['vertices'] = np.float32([marker_details['vertices'] + marker_details['av_velocity']]).reshape(-1,2)
-            
-            # Velocities are saved only if they are detected
-            marker_details['saved_velocities'] = np.zeros((0,4,2), dtype=np.float32)
-        
-        # Mark all markers undetected by default. This will be updated if it is detected.
-        marker_details['seen'] = False
-    
-    glPopMatrix()
-
-    # To update the screen
-    glFlush()
-    glutSwapBuffers()
-    
-"""
-Function name: compositeArray
-Output: Returns 4x4 array to draw the 3d image on the background
-Input: Rotation vector rvec and Translation vector tvec
-Logic: Appends transpose of tvec to column and [0,0,0,1] as last row
-Example call: matrix = compositeArray(rvec, tvec)
-"""
-
-def compositeArray(rvec, tvec):
-    v = np.c_[rvec, tvec.T]
-    v_ = np.r_[v, np.array([[0,0,0,1]])]
-    return v_
+            matrices = []
+
+        for (m, car) in zip(matrices, cars):
+            frame.draw_car(m, car)
+
+        # Age the undetected tracks and evict expired ones
+        self.tracks.step()
+
+        frame.end_frame()
+        self.latency.presented(t_capture, time.monotonic())
+
+        if self.gl_counter is not None:
+            self.gl_counter.end_frame('state' if self.cache_gl_state else 'immediate')
+            if sum(len(counts) for counts in self.gl_counter.frames.values()) % PROFILE_EVERY == 0:
+                print(self.gl_counter.report())
+
+    """
+    Function Name: reshape
+    Output: Changes the window size of the output window
+    Input: width and height
+    Logic: With the cached state path the projection is loaded here once, not every frame. The window size is kept for renderer.car_lod()
+    Example Call: app.reshape(width, height). In OpenGL main loop it is called as glutReshapeFunc(app.reshape)
+    """
+
+    def reshape(self, w, h):
+        self.window_size = (w, h)
+        mtx, dist = self.calibration
+        self.state.reshape(w, h, mtx[0,0], mtx[1,1], mtx[0,2], mtx[1,2])
+
+    """
+    Function Name: idle
+    Output: Redisplays the last image when the screen is idle or ended
+    Logic: Calls glutPostRedisplay()
+    Example Call: app.idle() (In OpenGL main loop it is called as glutIdleFunc(app.idle))
+    """
+
+    def idle(self):
+        self.renderer.glutPostRedisplay()
+
+    """
+    Function Name: keyboard
+    Output: Responds to keyboard inputs. If q is pressed, window is exited. If g is pressed, switches between the cached state and immediate mode drawing
+    Input: key pressed, x and y
+    Logic: Uses sys.exit() to exit
+    Example Call: app.keyboard(key,x,y). In OpenGL main loop it is called as glutKeyboardFunc(app.keyboard))
+    """
+
+    def keyboard(self, key, x, y):
+
+        # convert byte to str
+        key = key.decode('utf-8')
+        if key == 'q':
+            if self.gl_counter is not None:
+                print(self.gl_counter.report())
+            self.release()
+            sys.exit("q pressed. Exiting")
+
+        if key == 'g':
+            self.cache_gl_state = not self.cache_gl_state
+            self.state.invalidate() # The immediate mode path changes state behind the cache
+            print("Cached GL state" if self.cache_gl_state else "Immediate mode GL")
+
+    """
+    Function Name: run
+    Output: Opens the GL window and runs the OpenGL main loop
+    Logic: Imports renderer and render_state (and with them OpenGL) only here
+    Example Call: app.run()
+    """
+
+    def run(self):
+        import renderer
+        import render_state
+        self.renderer = renderer
+        self.state = render_state.RenderState()
+        self.window_size = (renderer.windowWidth, renderer.windowHeight)
+
+        renderer.open_window("Aruco Tracker", self.draw, self.keyboard, self.idle, self.reshape)
+
+        # Installed after the window is open, so compiling the car display lists is not counted in the first frame
+        if self.profile_gl:
+            self.gl_counter = render_state.GLCallCounter(renderer, render_state)
+
+        print("Recording started")
+
+        # This is the main loop for OpenGL
+        renderer.glutMainLoop()
+
+        sys.exit("Recording ended")
+
+    """
+    Function Name: release
+    Output: Releases the camera if it was opened and stops the pose and detection threads
+    Example Call: app.release()
+    """
+
+    def release(self):
+        self.poses.close()
+        if self.tiles is not None:
+            self.tiles.close()
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
 
 """
-Function name: idle
-Output: Redisplays the last image when the screen is idle or ended
-Logic: Calls glutPostRedisplay()
-Example call: idle() (In OpenGL main loop it is called as glutIdleFunc(idle))
+Function name: main
+Logic: Creates the tracker with the detector profile and allowed IDs given on the command line and runs it until the window is closed.
+       Without arguments detector.DEFAULT_PROFILE and detector.ALLOWED_IDS are used
+Example call: python aruco_tracker.py fast 1,7,23
 """
 
-def idle():
-    glutPostRedisplay()
+def main():
+    if len(sys.argv) > 3 or (len(sys.argv) > 1 and sys.argv[1] not in detector.DETECTOR_PROFILES):
+        sys.exit("Usage: python aruco_tracker.py [%s] [allowed ids, eg. 1,7,23]" % "|".join(sorted(detector.DETECTOR_PROFILES)))
 
-"""
-Function name: reshape
-Output: Changes the window size of the output window
-Input: width and height
-Example call: reshape(width, height). In OpenGL main loop it is called as glutReshapeFunc(reshape)
-"""
-   
-def reshape(w, h):
-    glViewport(0, 0, w, h)
-    glLoadIdentity()
-    glOrtho(-w / windowWidth, w / windowWidth, -h / windowHeight, h / windowHeight, -1.0, 1.0)
+    profile = sys.argv[1] if len(sys.argv) > 1 else None
+    allowed_ids = {int(m_id) for m_id in sys.argv[2].split(',')} if len(sys.argv) > 2 else None
 
-"""
-Function name: keyboard
-Output: Respnds to keyboard inputs. If q is pressed, window is exited
-Input: key pressed, x and y
-Logic: Uses sys.exit() to exit
-Example call: keyboard(key,x,y). In OpenGL main loop it is called as glutKeyboardFunc(keyboard))
-"""
-    
-def keyboard(key, x, y):
+    app = ArucoTracker(0, profile, allowed_ids)
 
-    # convert byte to str
-    key = key.decode('utf-8')
-    if key == 'q':
-        cap.release()
-        sys.exit("q pressed. Exiting")
+    try:
+        app.run()
 
-"""
-Function name: main
-Logic: Initializes GL window and GL
-Example call: main()
-"""
-    
-def main():
+    except Exception as e:
+        print(e)
+        print(traceback.format_exc())
+
+    finally:
+        app.release()
 
-	# Initialize OpenGL window
-    glutInitWindowPosition(0,0)
-    glutInitWindowSize(windowWidth, windowHeight)
-    glutInit(sys.argv)    
-    glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE | GLUT_DEPTH)
-    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)    
-    glutCreateWindow("Aruco Tracker")
-
-    # Displays the image and car in draw. It is called till the program ends    
-    glutDisplayFunc(draw)
-    glutReshapeFunc(reshape)
-
-    # To quit the window when 'q' is pressed
-    glutKeyboardFunc(keyboard)
-    glClearColor(0.0, 0.0, 0.0, 1.0)
-
-    # Enable lighting for 2d background projection
-    glEnable(GL_DEPTH_TEST)
-    glEnable(GL_LIGHTING)
-    glEnable(GL_LIGHT0)
-
-    # Idle function is called when the screen is idle ie. when video is over and window is open    
-    glutIdleFunc(idle)
-    
-    print("Recording started")
-
-    # This is the main loop for OpenGL
-    glutMainLoop()
-
-    sys.exit("Recording ended")
-    
-try:
-	# Start capturing video
-    cap = cv2.VideoCapture(0) 
-
-    # Initialize seen_ids with empty dictionary 
-    seen_ids = {}
-
-    # Call main
+if __name__ == '__main__':
     main()
-    
-except Exception as e:
-    print(e)
-    print(traceback.format_exc())
-    
-finally:
-    cap.release()
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: ground_truth, simulate, main
+Global variables: FPS, READ_DELAY, LATENCY, JITTER, FRAMES, SIDE
+
+Synthetic benchmark of latency compensation. A marker moves along a known path, frames are exposed at FPS,
+returned by the camera READ_DELAY seconds later and reach the screen LATENCY seconds after that.
+The tracker and LatencyCompensator see only the captured vertices and the read time, and the frame timestamp if the camera has one.
+The error is the mean distance between drawn and true vertices at display time, without extrapolation,
+with the latency measured from the read (the delay before it is missed), from a configured capture_delay and from the frame timestamp.
+Run from the Code folder: python bench_latency.py
+"""
+
+import numpy as np
+import tracker
+import latency
+
+FPS = 30.0
+READ_DELAY = 0.04 # Seconds from exposure to cap.read() returning (exposure, transfer and driver buffering)
+LATENCY = 0.045   # Seconds from cap.read() returning to display
+JITTER = 0.005    # Standard deviation of the latency (seconds)
+FRAMES = 600
+SIDE = 60.0       # Side of the marker in pixels
+
+"""
+Function name: ground_truth
+Output: Returns the true vertices (4 x 2) of the marker at time t
+Input: Time in seconds
+Logic: The marker circles the centre of a 640 x 480 image and turns slowly
+Example call: vertices = ground_truth(1.5)
+"""
+
+def ground_truth(t):
+    centre = np.array([320 + 200 * np.cos(0.8 * t), 240 + 150 * np.sin(1.3 * t)])
+    angle = 0.5 * t
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    square = SIDE / 2 * np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])
+    return np.float32(centre + square.dot(rotation.T))
+
+"""
+Function name: simulate
+Output: Returns the mean vertex error (pixels) at display time
+Input: True to extrapolate with the measured latency, False to draw the captured pose,
+       the capture_delay of the LatencyCompensator and True if the camera gives frame timestamps
+Logic: The display time is known exactly here, so display_delay is 0
+Example call: error = simulate(True, capture_delay = READ_DELAY)
+"""
+
+def simulate(compensate, capture_delay = 0.0, stamped = False):
+    rng = np.random.default_rng(0)
+    tracks = tracker.TrackManager(history = latency.VELOCITY_HISTORY)
+    compensator = latency.LatencyCompensator(capture_delay, display_delay = 0.0)
+    errors = []
+
+    for frame in range(FRAMES):
+        t_exposure = frame / FPS
+        t_read = t_exposure + READ_DELAY
+        t_capture = compensator.capture_time(t_read, t_exposure if stamped else None)
+        compensator.captured(t_capture)
+
+        tracks.update(np.float32([ground_truth(t_exposure)]), [0])
+        marker_details = tracks[0]
+
+        lead = compensator.lead() if compensate else 0.0
+        drawn = latency.extrapolate(marker_details['vertices'], marker_details['av_velocity'], lead)
+
+        t_display = t_read + max(0.0, rng.normal(LATENCY, JITTER))
+        compensator.presented(t_capture, t_display)
+        tracks.step()
+
+        if frame >= FPS: # Skip the first second while the averages settle
+            errors.append(np.linalg.norm(drawn - ground_truth(t_display), axis = 1).mean())
+
+    return float(np.mean(errors))
+
+"""
+Function name: main
+Logic: Prints the error without latency compensation and with the latency measured from the read, from capture_delay and from the frame timestamp
+Example call: python bench_latency.py
+"""
+
+def main():
+    print("exposure to read %.0f ms, read to display %.0f ms at %.0f fps" % (1000 * READ_DELAY, 1000 * LATENCY, FPS))
+    print("captured pose                    %6.2f px" % simulate(False))
+    print("extrapolated, from read          %6.2f px" % simulate(True))
+    print("extrapolated, with capture_delay %6.2f px" % simulate(True, capture_delay = READ_DELAY))
+    print("extrapolated, from timestamp     %6.2f px" % simulate(True, stamped = True))
+
+if __name__ == '__main__':
+    main()
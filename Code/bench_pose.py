@@ -0,0 +1,138 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: synthetic_markers, reference_poses, time_solve, crossover, main
+Global variables: COUNTS, REPEATS, SPEEDUP_MARGIN
+
+Benchmarks the pose stage for a growing number of markers:
+'per marker' is the original loop (cv2.Rodrigues and a matrix build per marker), 'serial' is pose.solve_poses
+and 'parallel' is pose.PoseSolver with the pool always used. All three must give the same matrices.
+Prints the smallest batch from which the pool is consistently faster, to be used as PoseSolver(min_markers = ...).
+Run from the Code folder: python bench_pose.py
+"""
+
+import cv2
+import numpy as np
+import time
+import aruco_tracker
+import pose
+
+COUNTS = (1, 5, 10, 25, 50, 100, 200, 400)
+REPEATS = 20
+SPEEDUP_MARGIN = 1.1 # The pool must be at least this much faster to be worth it
+
+"""
+Function name: synthetic_markers
+Output: Returns vertices (N x 4 x 2) of n markers with random poses in front of the camera
+Input: Number of markers, camera matrix, distortion coefficients and a random generator
+Logic: Projects the corners of a marker of side pose.MARKER_LENGTH with cv2.projectPoints
+Example call: quads = synthetic_markers(50, mtx, dist, np.random.default_rng(0))
+"""
+
+def synthetic_markers(n, mtx, dist, rng):
+    half = pose.MARKER_LENGTH / 2
+    corners = np.float32([[-half, half, 0], [half, half, 0], [half, -half, 0], [-half, -half, 0]])
+
+    quads = []
+    for _ in range(n):
+        rvec = rng.uniform(-0.5, 0.5, 3)
+        tvec = np.array([rng.uniform(-20, 20), rng.uniform(-15, 15), rng.uniform(60, 150)])
+        points, _ = cv2.projectPoints(corners, rvec, tvec, mtx, dist)
+        quads.append(points.reshape(4,2))
+
+    return np.float32(quads)
+
+"""
+Function name: reference_poses
+Output: Returns the 4x4 model view matrices of the markers computed one marker at a time, as draw() originally did
+Input: Vertices of the markers (N x 4 x 2), camera matrix and distortion coefficients
+Example call: matrices = reference_poses(quads, mtx, dist)
+"""
+
+def reference_poses(quads, mtx, dist):
+    rvecs, tvecs, _ = cv2.aruco.estimatePoseSingleMarkers(list(np.float32(quads).reshape(-1,1,4,2)), pose.MARKER_LENGTH, mtx, dist)
+
+    matrices = []
+    for i in range(len(quads)):
+        rvec = np.array(rvecs[i], dtype = np.float64)
+        tvec = np.array(tvecs[i], dtype = np.float64)
+
+        # Fix axis
+        tvec[0,1] = -tvec[0,1]
+        tvec[0,2] = -tvec[0,2]
+        rvec[0,1] = -rvec[0,1]
+
+        v = np.c_[cv2.Rodrigues(rvec)[0], tvec[0].T]
+        matrices.append(np.r_[v, np.array([[0,0,0,1]])])
+    return np.array(matrices)
+
+"""
+Function name: time_solve
+Output: Returns the mean time (seconds) of one call of solve and its last result
+Input: Solve function, vertices, camera matrix and distortion coefficients
+Example call: seconds, matrices = time_solve(pose.solve_poses, quads, mtx, dist)
+"""
+
+def time_solve(solve, quads, mtx, dist):
+    matrices = solve(quads, mtx, dist) # Warm up (starts the pool)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        matrices = solve(quads, mtx, dist)
+    return (time.perf_counter() - start) / REPEATS, matrices
+
+"""
+Function name: crossover
+Output: Returns the smallest marker count from which every larger count has speedup >= SPEEDUP_MARGIN, or None
+Input: List of (marker count, speedup) in increasing count
+Example call: min_markers = crossover([(10, 0.8), (50, 1.3), (100, 1.6)])
+"""
+
+def crossover(speedups):
+    best = None
+    for (n, speedup) in reversed(speedups):
+        if speedup < SPEEDUP_MARGIN:
+            break
+        best = n
+    return best
+
+"""
+Function name: main
+Logic: Prints the per marker, serial and parallel times, speed up of the pool and number of chunks for each marker count,
+       then the measured crossover
+Example call: python bench_pose.py
+"""
+
+def main():
+    mtx, dist = aruco_tracker.load_calibration()
+    rng = np.random.default_rng(0)
+    solver = pose.PoseSolver(min_markers = 1) # Always use the pool when there is more than one chunk
+
+    print("workers %d, at least %d markers per chunk" % (solver.workers, solver.min_chunk))
+    print("%8s %14s %12s %12s %8s %7s" % ('markers', 'per marker ms', 'serial ms', 'parallel ms', 'speedup', 'chunks'))
+
+    speedups = []
+    for n in COUNTS:
+        quads = synthetic_markers(n, mtx, dist, rng)
+        reference, expected = time_solve(reference_poses, quads, mtx, dist)
+        serial, matrices = time_solve(pose.solve_poses, quads, mtx, dist)
+        parallel, pooled = time_solve(solver.solve, quads, mtx, dist)
+
+        if not np.allclose(expected, matrices, atol = 1e-9):
+            raise AssertionError("Vectorised poses differ from per marker poses for %d markers" % n)
+        if not np.array_equal(matrices, pooled):
+            raise AssertionError("Parallel poses differ from serial poses for %d markers" % n)
+
+        speedups.append((n, serial / parallel))
+        print("%8d %14.3f %12.3f %12.3f %8.2f %7d" % (n, 1000 * reference, 1000 * serial, 1000 * parallel, serial / parallel, solver.chunks(n)))
+
+    solver.close()
+
+    min_markers = crossover(speedups)
+    if min_markers is None:
+        print("The pool is never %.1fx faster here. Keep PoseSolver(min_markers = None)" % SPEEDUP_MARGIN)
+    else:
+        print("The pool is at least %.1fx faster from %d markers. Use PoseSolver(min_markers = %d)" % (SPEEDUP_MARGIN, min_markers, min_markers))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: import_time, main
+Global variables: CASES, TARGET_RATIO, REPEATS
+
+Measures how long a fresh interpreter takes to get ready for detection.
+'detection' imports aruco_tracker and creates the dictionary and detector parameters, the way detection-only tools do.
+'baseline' does what importing the original aruco_tracker did at import time: import OpenGL (GL, GLU, GLUT), cv2 and numpy,
+load the calibration npz and create the dictionary. Opening the camera is left out, so the baseline is a lower bound.
+Most of the detection cost is importing cv2, which both cases pay, so the saving is mainly the OpenGL import.
+The target is met if detection takes at most TARGET_RATIO of the baseline and does not import OpenGL.
+Run from the Code folder: python bench_startup.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+CASES = {
+    'detection': "import aruco_tracker; app = aruco_tracker.ArucoTracker(); app.dictionary; app.parameters",
+    'baseline': "from OpenGL.GL import *; from OpenGL.GLU import *; from OpenGL.GLUT import *; import cv2, cv2.aruco as aruco, numpy as np; "
+                "X = np.load('../Data/camera_calibration.npz'); X['mtx'], X['dist']; aruco.Dictionary_get(aruco.DICT_ARUCO_ORIGINAL)",
+}
+
+TARGET_RATIO = 0.75 # Importing cv2 alone is about half of the baseline, so the target cannot be much lower
+REPEATS = 5
+
+"""
+Function name: import_time
+Output: Returns the median wall time (seconds) of running the statement in a new interpreter
+Input: Python statement and number of repeats
+Logic: The interpreter start up time (running 'pass') is subtracted
+Example call: seconds = import_time("import aruco_tracker")
+"""
+
+def import_time(statement, repeats = REPEATS):
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def run(code):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.check_call([sys.executable, '-c', code], cwd = here)
+            times.append(time.perf_counter() - start)
+        return sorted(times)[len(times) // 2]
+
+    return run(statement) - run("pass")
+
+"""
+Function name: main
+Logic: Times every case, checks that OpenGL stays unimported and prints whether the target is met
+Example call: python bench_startup.py
+"""
+
+def main():
+    results = {}
+    for (name, statement) in CASES.items():
+        results[name] = import_time(statement)
+        print("%-10s %8.1f ms" % (name, 1000 * results[name]))
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    gl_loaded = subprocess.call([sys.executable, '-c', "import sys, aruco_tracker; sys.exit('OpenGL' in sys.modules)"], cwd = here)
+
+    ratio = results['detection'] / results['baseline']
+    print("detection / baseline = %.2f (target <= %.2f)" % (ratio, TARGET_RATIO))
+
+    if gl_loaded:
+        sys.exit("Importing aruco_tracker imported OpenGL")
+    if ratio > TARGET_RATIO:
+        sys.exit("Startup target missed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: synthetic_frame, time_detect, main
+Global variables: SIZES, MARKERS, REPEATS, SPEEDUP_MARGIN
+
+Benchmarks detection on high resolution frames: 'whole' is detector.detect on the full frame, 'tiled' is
+detector.TiledDetector on one thread and 'pooled' is TiledDetector on a pool of pool.MAX_WORKERS threads.
+All three must find the same IDs. detectMarkers already spreads its work over OpenCV's own threads, so the pool
+is only worth it if it is measured to be faster. Prints the workers to use as ArucoTracker(tile_workers = ...).
+Run from the Code folder: python bench_tiles.py
+"""
+
+import cv2.aruco as aruco
+import numpy as np
+import time
+import detector
+import pool
+
+SIZES = ((1920, 1080), (3264, 2448), (4000, 3000))
+MARKERS = 40
+REPEATS = 5
+SPEEDUP_MARGIN = 1.1 # The pool must be at least this much faster to be worth it
+
+"""
+Function name: synthetic_frame
+Output: Returns a grey frame with markers drawn on it and the set of drawn IDs
+Input: Width and height of the frame, dictionary, number of markers and a random generator
+Logic: The frame is split into cells of detector.MAX_MARKER_SIZE pixels. Markers of random size up to
+       the cell size (minus a white border) are drawn with aruco.drawMarker into randomly picked cells
+Example call: img, ids = synthetic_frame(4000, 3000, dictionary, 40, np.random.default_rng(0))
+"""
+
+def synthetic_frame(w, h, dictionary, n, rng):
+    img = np.full((h, w), 255, dtype = np.uint8)
+    cell = detector.MAX_MARKER_SIZE
+    cells = [(x, y) for y in range(0, h - cell + 1, cell) for x in range(0, w - cell + 1, cell)]
+
+    ids = set()
+    for (index, m_id) in zip(rng.permutation(len(cells))[:n], rng.permutation(1024)[:n]):
+        x, y = cells[index]
+        side = int(rng.integers(50, cell - 40))
+        x += int(rng.integers(20, cell - side - 19))
+        y += int(rng.integers(20, cell - side - 19))
+        img[y:y + side, x:x + side] = aruco.drawMarker(dictionary, int(m_id), side)
+        ids.add(int(m_id))
+
+    return img, ids
+
+"""
+Function name: time_detect
+Output: Returns the mean time (seconds) of one call of detect and the set of IDs it found
+Input: Detect function taking an image, and the image
+Example call: seconds, found = time_detect(lambda img: detector.detect(img, dictionary, parameters), img)
+"""
+
+def time_detect(detect, img):
+    _, ids = detect(img) # Warm up (starts the pool)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        _, ids = detect(img)
+    seconds = (time.perf_counter() - start) / REPEATS
+    return seconds, set() if ids is None else set(int(m_id) for m_id in ids.ravel())
+
+"""
+Function name: main
+Logic: Prints the whole frame, tiled and pooled times, speed up of the pool and number of drawn and found markers
+       for each frame size, then the workers to use
+Example call: python bench_tiles.py
+"""
+
+def main():
+    dictionary = aruco.Dictionary_get(aruco.DICT_ARUCO_ORIGINAL)
+    parameters = detector.make_parameters()
+    rng = np.random.default_rng(0)
+    tiled = detector.TiledDetector(workers = 1)
+    pooled = detector.TiledDetector(workers = pool.MAX_WORKERS)
+
+    print("profile %s, tile size %d, overlap %d, %d workers" % (detector.DEFAULT_PROFILE, tiled.tile_size, tiled.max_marker_size, pooled.workers))
+    print("%11s %10s %10s %10s %8s %7s %6s" % ('frame', 'whole ms', 'tiled ms', 'pooled ms', 'speedup', 'drawn', 'found'))
+
+    speedups = []
+    for (w, h) in SIZES:
+        img, drawn = synthetic_frame(w, h, dictionary, MARKERS, rng)
+        whole, expected = time_detect(lambda frame: detector.detect(frame, dictionary, parameters), img)
+        serial, found = time_detect(lambda frame: tiled.detect(frame, dictionary, parameters), img)
+        parallel, found_pooled = time_detect(lambda frame: pooled.detect(frame, dictionary, parameters), img)
+
+        if found != expected:
+            raise AssertionError("Tiled detection differs from whole frame detection at %dx%d: %s" % (w, h, sorted(found ^ expected)))
+        if found_pooled != found:
+            raise AssertionError("Pooled detection differs from tiled detection at %dx%d: %s" % (w, h, sorted(found_pooled ^ found)))
+
+        speedups.append(serial / parallel)
+        print("%5dx%-5d %10.1f %10.1f %10.1f %8.2f %7d %6d" % (w, h, 1000 * whole, 1000 * serial, 1000 * parallel, serial / parallel, len(drawn), len(found)))
+
+    tiled.close()
+    pooled.close()
+
+    if min(speedups) >= SPEEDUP_MARGIN:
+        print("The pool is at least %.1fx faster at every size. Use ArucoTracker(tile_workers = %d)" % (SPEEDUP_MARGIN, pooled.workers))
+    else:
+        print("The pool is not %.1fx faster at every size here. Keep ArucoTracker(tile_workers = 1)" % SPEEDUP_MARGIN)
+
+if __name__ == '__main__':
+    main()
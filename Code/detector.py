@@ -0,0 +1,370 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: make_parameters, scale_parameters, filter_ids, detect, tile_grid, merge_detections, TiledDetector, benchmark_parameters, auto_tune, main
+Global variables: DETECTOR_PROFILES, DEFAULT_PROFILE, ALLOWED_IDS, MAX_MARKER_SIZE, MERGE_DISTANCE, TILE_WORKERS
+"""
+
+import cv2
+import cv2.aruco as aruco
+import numpy as np
+import pool
+import time
+import sys
+
+# Named detector profiles. Each profile only lists the fields it changes from the OpenCV defaults.
+# adaptiveThreshWinSize* --> Window sizes tried for adaptive thresholding. Fewer windows means fewer passes over the image.
+# min/maxMarkerPerimeterRate --> Marker perimeter relative to the largest image side. Candidates outside this range are rejected early.
+# cornerRefinementMethod --> Sub pixel corner refinement. Improves pose stability at the cost of time.
+DETECTOR_PROFILES = {
+    'fast': {
+        'adaptiveThreshWinSizeMin': 5,
+        'adaptiveThreshWinSizeMax': 15,
+        'adaptiveThreshWinSizeStep': 10,
+        'minMarkerPerimeterRate': 0.05,
+        'maxMarkerPerimeterRate': 2.0,
+        'polygonalApproxAccuracyRate': 0.05,
+        'cornerRefinementMethod': aruco.CORNER_REFINE_NONE,
+    },
+    'balanced': {
+        'adaptiveThreshWinSizeMin': 3,
+        'adaptiveThreshWinSizeMax': 23,
+        'adaptiveThreshWinSizeStep': 10,
+        'minMarkerPerimeterRate': 0.03,
+        'maxMarkerPerimeterRate': 4.0,
+        'polygonalApproxAccuracyRate': 0.03,
+        'cornerRefinementMethod': aruco.CORNER_REFINE_NONE,
+    },
+    'accurate': {
+        'adaptiveThreshWinSizeMin': 3,
+        'adaptiveThreshWinSizeMax': 33,
+        'adaptiveThreshWinSizeStep': 5,
+        'minMarkerPerimeterRate': 0.02,
+        'maxMarkerPerimeterRate': 4.0,
+        'polygonalApproxAccuracyRate': 0.03,
+        'cornerRefinementMethod': aruco.CORNER_REFINE_SUBPIX,
+        'cornerRefinementWinSize': 5,
+    },
+}
+
+DEFAULT_PROFILE = 'balanced'
+
+# IDs of DICT_ARUCO_ORIGINAL that are actually used. Any other detected ID is dropped before pose estimation.
+# None means every ID is accepted. It is read on every call, so it may be changed at runtime.
+ALLOWED_IDS = None
+
+# Tiled detection. Tiles overlap by MAX_MARKER_SIZE pixels so every marker lies completely inside at least one tile.
+# Detections of the same ID whose corners are on average closer than MERGE_DISTANCE pixels are the same marker.
+MAX_MARKER_SIZE = 400
+MERGE_DISTANCE = 8.0
+
+# Threads the tiles are detected on. aruco.detectMarkers already spreads its work over OpenCV's own threads,
+# so an extra pool may only oversubscribe the cores. No gain has been measured, so tiles are detected one after another.
+# Run bench_tiles.py, which compares whole frame, tiled and pooled detection on the machine, before raising it.
+TILE_WORKERS = 1
+
+"""
+Function name: make_parameters
+Output: Returns aruco detector parameters for a named profile
+Input: Profile name (key of DETECTOR_PROFILES, None for DEFAULT_PROFILE) and optional overrides as keyword arguments
+Logic: Starts from the OpenCV defaults and sets each field of the profile
+Example call: parameters = make_parameters('fast', minMarkerPerimeterRate = 0.1)
+"""
+
+def make_parameters(profile = None, **overrides):
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if profile not in DETECTOR_PROFILES:
+        raise ValueError("Unknown detector profile '%s'. Choose from %s" % (profile, sorted(DETECTOR_PROFILES)))
+
+    parameters = aruco.DetectorParameters_create()
+    settings = dict(DETECTOR_PROFILES[profile])
+    settings.update(overrides)
+
+    for name, value in settings.items():
+        setattr(parameters, name, value)
+
+    return parameters
+
+"""
+Function name: scale_parameters
+Output: Returns a copy of detector parameters with minMarkerPerimeterRate and maxMarkerPerimeterRate multiplied by scale
+Input: Detector parameters and scale factor
+Logic: The rates are relative to the largest side of the image. Detecting on a crop of a frame with the rates scaled by
+       max(frame side) / max(crop side) accepts the same marker sizes in pixels as detecting on the whole frame
+Example call: tile_parameters = scale_parameters(parameters, 4000 / 1200.0)
+"""
+
+def scale_parameters(parameters, scale):
+    scaled = aruco.DetectorParameters_create()
+    for name in dir(parameters):
+        value = getattr(parameters, name)
+        if not name.startswith('_') and not callable(value):
+            setattr(scaled, name, value)
+
+    scaled.minMarkerPerimeterRate = parameters.minMarkerPerimeterRate * scale
+    scaled.maxMarkerPerimeterRate = parameters.maxMarkerPerimeterRate * scale
+    return scaled
+
+"""
+Function name: filter_ids
+Output: Returns corners and ids containing only the allowed IDs. ids is None if nothing is left
+Input: corners and ids as returned by aruco.detectMarkers and a collection of allowed IDs
+Logic: Builds a boolean mask over the flattened ids and keeps the matching corners
+Example call: corners, ids = filter_ids(corners, ids, {1, 7, 23})
+"""
+
+def filter_ids(corners, ids, allowed):
+    if ids is None or allowed is None:
+        return corners, ids
+
+    keep = np.isin(ids.ravel(), list(allowed))
+    if not keep.any():
+        return [], None
+
+    corners = [corner for (corner, k) in zip(corners, keep) if k]
+    return corners, ids[keep].reshape(-1, 1)
+
+"""
+Function name: detect
+Output: Returns corners and ids of the markers found in the image
+Input: Image, dictionary, detector parameters and optional allowed IDs (None for ALLOWED_IDS)
+Logic: Calls aruco.detectMarkers and drops unknown IDs with filter_ids(). Rejected candidates are discarded
+Example call: corners, ids = detect(img, dictionary, parameters, {1, 7, 23})
+"""
+
+def detect(img, dictionary, parameters, allowed = None):
+    if allowed is None:
+        allowed = ALLOWED_IDS
+    corners, ids, _ = aruco.detectMarkers(img, dictionary, parameters = parameters)
+    return filter_ids(corners, ids, allowed)
+
+"""
+Function name: tile_grid
+Output: Returns the (x0, y0, x1, y1) bounds of overlapping tiles covering an image
+Input: Width and height of the image, side of a tile and overlap between neighbouring tiles (pixels)
+Logic: Tiles start every tile_size - overlap pixels. The last tile of a row or column is moved back to end at the image border
+Example call: tiles = tile_grid(4000, 3000, 1200, 400)
+"""
+
+def tile_grid(w, h, tile_size, overlap):
+    if tile_size <= overlap:
+        raise ValueError("tile_size (%d) must be larger than the overlap (%d)" % (tile_size, overlap))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        step = tile_size - overlap
+        points = list(range(0, length - tile_size, step))
+        return points + [length - tile_size]
+
+    return [(x, y, min(x + tile_size, w), min(y + tile_size, h)) for y in starts(h) for x in starts(w)]
+
+"""
+Function name: merge_detections
+Output: Returns corners and ids (in the format of aruco.detectMarkers) with duplicates removed. ids is None if there are none
+Input: List of (corners (4 x 2), id, margin) in full frame coordinates and the merge distance in pixels
+Logic: A marker in the overlap of two tiles is found twice. Detections are taken in order of their margin (distance to the
+       border of their tile), and a detection is dropped if one with the same ID and mean corner distance below merge_distance was kept
+Example call: corners, ids = merge_detections(detections, MERGE_DISTANCE)
+"""
+
+def merge_detections(detections, merge_distance = MERGE_DISTANCE):
+    kept = []
+    for (quad, m_id, margin) in sorted(detections, key = lambda d: -d[2]):
+        duplicate = any(m_id == k_id and np.linalg.norm(quad - k_quad, axis = 1).mean() < merge_distance for (k_quad, k_id, _) in kept)
+        if not duplicate:
+            kept.append((quad, m_id, margin))
+
+    if not kept:
+        return [], None
+
+    corners = [quad.reshape(1,4,2) for (quad, _, _) in kept]
+    ids = np.int32([[m_id] for (_, m_id, _) in kept])
+    return corners, ids
+
+"""
+Class Name: TiledDetector
+Logic: For very high resolution frames. The frame is split into overlapping tiles (see tile_grid()) that are detected one after
+       another, or in parallel on a persistent thread pool (see pool.LazyPool) if workers > 1. OpenCV releases the GIL while detecting. Corners are moved back to full frame
+       coordinates and markers found in two tiles are merged with merge_detections().
+       Each tile is detected with the perimeter rates scaled to the tile (see scale_parameters()), so the same marker sizes are accepted
+       as by detect() on the whole frame. The scaled copies are kept until the frame size or the parameters object changes.
+Parameters: tile_size --> Side of a tile in pixels. Should be a few times max_marker_size and must be larger than it (ValueError otherwise)
+            max_marker_size --> Largest width or height of a marker in the frame (pixels), used as the overlap between tiles
+            workers --> Number of threads. 1 (TILE_WORKERS) detects the tiles serially. See bench_tiles.py
+            merge_distance --> See merge_detections()
+Example Call: tiles = TiledDetector(1200); corners, ids = tiles.detect(img, dictionary, parameters)
+"""
+
+class TiledDetector:
+
+    def __init__(self, tile_size = 3 * MAX_MARKER_SIZE, max_marker_size = MAX_MARKER_SIZE, workers = TILE_WORKERS, merge_distance = MERGE_DISTANCE):
+        # Checked here so a bad tile size fails when the tracker is created, not on the first frame
+        if tile_size <= max_marker_size:
+            raise ValueError("tile_size (%d) must be larger than max_marker_size (%d)" % (tile_size, max_marker_size))
+
+        self.tile_size = tile_size
+        self.max_marker_size = max_marker_size
+        self.workers = workers
+        self.merge_distance = merge_distance
+        self._pool = pool.LazyPool(workers, 'detect')
+        self._grid = {}
+        self._scaled_from = None # Parameters the cached tile parameters were made from
+        self._tile_parameters = {}
+
+    """
+    Function Name: detect_tile
+    Output: Returns the list of (corners (4 x 2), id, margin) found in one tile, in full frame coordinates
+    Input: Image, tile bounds, dictionary, detector parameters and allowed IDs
+    Example Call: detections = tiles.detect_tile(img, (0, 0, 1200, 1200), dictionary, parameters, None)
+    """
+
+    def detect_tile(self, img, tile, dictionary, parameters, allowed):
+        x0, y0, x1, y1 = tile
+        corners, ids = detect(img[y0:y1, x0:x1], dictionary, parameters, allowed)
+        if ids is None:
+            return []
+
+        detections = []
+        for (corner, m_id) in zip(corners, ids.ravel()):
+            quad = np.float32(corner).reshape(4,2)
+            margin = min(quad[:,0].min(), quad[:,1].min(), (x1 - x0) - quad[:,0].max(), (y1 - y0) - quad[:,1].max())
+            detections.append((quad + np.float32([x0, y0]), m_id, margin))
+        return detections
+
+    """
+    Function Name: tile_parameters
+    Output: Returns the detector parameters of each tile of a w x h frame, in the order of the tiles
+    Input: Detector parameters for the whole frame, width and height of the frame
+    Logic: Scales the perimeter rates of each tile by max(w, h) / max(tile width, tile height) with scale_parameters()
+    Example Call: parameters = tiles.tile_parameters(parameters, 4000, 3000)
+    """
+
+    def tile_parameters(self, parameters, w, h):
+        if self._scaled_from is not parameters:
+            self._scaled_from = parameters
+            self._tile_parameters = {}
+
+        if (w, h) not in self._tile_parameters:
+            scaled = {}
+            for (x0, y0, x1, y1) in self._grid[(w, h)]:
+                side = max(x1 - x0, y1 - y0)
+                if side not in scaled:
+                    scaled[side] = scale_parameters(parameters, max(w, h) / float(side))
+            self._tile_parameters[(w, h)] = [scaled[max(x1 - x0, y1 - y0)] for (x0, y0, x1, y1) in self._grid[(w, h)]]
+
+        return self._tile_parameters[(w, h)]
+
+    """
+    Function Name: detect
+    Output: Returns corners and ids of the markers in the frame, like detect()
+    Input: Image, dictionary, detector parameters and optional allowed IDs (None for ALLOWED_IDS)
+    Example Call: corners, ids = tiles.detect(img, dictionary, parameters)
+    """
+
+    def detect(self, img, dictionary, parameters, allowed = None):
+        h, w = img.shape[:2]
+        if (w, h) not in self._grid:
+            self._grid[(w, h)] = tile_grid(w, h, self.tile_size, self.max_marker_size)
+        tiles = list(zip(self._grid[(w, h)], self.tile_parameters(parameters, w, h)))
+
+        if len(tiles) == 1 or self.workers < 2:
+            results = [self.detect_tile(img, tile, dictionary, tile_parameters, allowed) for (tile, tile_parameters) in tiles]
+        else:
+            results = self._pool.map(lambda tile: self.detect_tile(img, tile[0], dictionary, tile[1], allowed), tiles)
+
+        detections = [detection for result in results for detection in result]
+        return merge_detections(detections, self.merge_distance)
+
+    """
+    Function Name: close
+    Output: Shuts down the thread pool if it was started
+    Example Call: tiles.close()
+    """
+
+    def close(self):
+        self._pool.close()
+
+"""
+Function name: benchmark_parameters
+Output: Returns mean detection time per frame (seconds) and the set of (frame index, id) detections
+Input: List of frames, dictionary, detector parameters and optional allowed IDs (None for ALLOWED_IDS)
+Logic: Runs detect() over every frame and times it with time.perf_counter()
+Example call: seconds, found = benchmark_parameters(frames, dictionary, parameters)
+"""
+
+def benchmark_parameters(frames, dictionary, parameters, allowed = None):
+    found = set()
+    start = time.perf_counter()
+
+    for (index, frame) in enumerate(frames):
+        _, ids = detect(frame, dictionary, parameters, allowed)
+        if ids is not None:
+            found.update((index, m_id) for m_id in ids.ravel())
+
+    return (time.perf_counter() - start) / max(len(frames), 1), found
+
+"""
+Function name: auto_tune
+Output: Returns the name of the fastest profile meeting the recall target and a dictionary of results for every profile
+Input: List of recorded frames, dictionary, recall target (0 to 1), optional allowed IDs (None for ALLOWED_IDS) and candidate profiles
+Logic: The 'accurate' profile gives the reference detections. Recall of a profile is the fraction of reference detections it also finds.
+       Profiles are benchmarked and the fastest one with recall >= target is picked. Falls back to the reference profile.
+Example call: profile, results = auto_tune(frames, dictionary, 0.95)
+"""
+
+def auto_tune(frames, dictionary, target_recall = 0.95, allowed = None, profiles = None):
+    if profiles is None:
+        profiles = list(DETECTOR_PROFILES)
+
+    _, reference = benchmark_parameters(frames, dictionary, make_parameters('accurate'), allowed)
+
+    results = {}
+    for profile in profiles:
+        seconds, found = benchmark_parameters(frames, dictionary, make_parameters(profile), allowed)
+        recall = len(found & reference) / float(len(reference)) if reference else 1.0
+        results[profile] = {'seconds': seconds, 'recall': recall}
+
+    passing = [profile for profile in results if results[profile]['recall'] >= target_recall]
+    if not passing:
+        return 'accurate', results
+
+    return min(passing, key = lambda profile: results[profile]['seconds']), results
+
+"""
+Function name: main
+Logic: Loads frames from a recorded video, runs auto_tune() and prints the results
+Example call: python detector.py recording.avi 0.95
+"""
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python detector.py <video> [target_recall] [max_frames]")
+
+    target_recall = float(sys.argv[2]) if len(sys.argv) > 2 else 0.95
+    max_frames = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    cap = cv2.VideoCapture(sys.argv[1])
+    frames = []
+    while len(frames) < max_frames:
+        ret, img = cap.read()
+        if not ret:
+            break
+        frames.append(img)
+    cap.release()
+
+    if not frames:
+        sys.exit("No frames could be read from %s" % sys.argv[1])
+
+    dictionary = aruco.Dictionary_get(aruco.DICT_ARUCO_ORIGINAL)
+    best, results = auto_tune(frames, dictionary, target_recall)
+
+    for profile in sorted(results, key = lambda p: results[p]['seconds']):
+        print("%-10s %8.2f ms/frame  recall %.3f" % (profile, 1000 * results[profile]['seconds'], results[profile]['recall']))
+    print("Selected profile: %s" % best)
+    print("Run the tracker with it: python aruco_tracker.py %s" % best)
+
+if __name__ == '__main__':
+    main()
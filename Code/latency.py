@@ -0,0 +1,114 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: extrapolate, LatencyCompensator
+Global variables: SMOOTHING, VELOCITY_HISTORY, CAPTURE_DELAY, DISPLAY_DELAY, MAX_STAMP_AGE
+
+The car is drawn from a frame captured some time before it reaches the screen, so it lags behind moving markers.
+LatencyCompensator measures the time between frames and the time from capture to display. Times are time.monotonic() seconds.
+The capture time is the camera's own frame timestamp when the backend gives one on the same clock (V4L2 on Linux does).
+Otherwise it is the time cap.read() returned minus capture_delay, the exposure, transfer and buffering time of the camera.
+extrapolate() moves the vertices of a marker forward by its average velocity to where they should be at display time.
+"""
+
+import numpy as np
+
+SMOOTHING = 0.1 # Weight of the newest measurement in the running averages
+
+# Frames the velocity is averaged over when extrapolating. A long average lags behind turning markers
+VELOCITY_HISTORY = 5
+
+# Estimates used when they cannot be measured. CAPTURE_DELAY is about one frame at 30 fps, used only without a backend timestamp.
+# DISPLAY_DELAY is the time from the non-blocking buffer swap to the image on screen, about one refresh interval at 60 Hz.
+CAPTURE_DELAY = 0.033
+DISPLAY_DELAY = 0.016
+
+# A backend timestamp is trusted only if it lies between 0 and MAX_STAMP_AGE seconds before cap.read() returned.
+# Video files report their position instead, which fails this check
+MAX_STAMP_AGE = 1.0
+
+"""
+Function name: extrapolate
+Output: Returns the vertices moved forward by a number of frames
+Input: Vertices (4 x 2), average velocity of each vertex in pixels per frame (4 x 2) and number of frames (may be fractional)
+Example call: vertices = extrapolate(marker_details['vertices'], marker_details['av_velocity'], 1.5)
+"""
+
+def extrapolate(vertices, velocity, frames):
+    return np.float32(vertices + velocity * frames)
+
+"""
+Class Name: LatencyCompensator
+Logic: capture_time() gives the capture time of a frame, captured() is called with it and presented() once the frame is swapped
+       to the screen. Both intervals are kept as running averages. lead() gives how many frames ahead of capture the frame is shown,
+       which is the number of frames to extrapolate by.
+Parameters: capture_delay --> Time (seconds) from exposure to cap.read() returning, used when the backend has no frame timestamp
+            display_delay --> Extra time (seconds) between the buffer swap and the image appearing
+            max_lead --> Largest number of frames to extrapolate by, so a stall does not throw the cars far away
+Example Call: latency = LatencyCompensator(capture_delay = 0.05, display_delay = 0.016)
+"""
+
+class LatencyCompensator:
+
+    def __init__(self, capture_delay = CAPTURE_DELAY, display_delay = DISPLAY_DELAY, max_lead = 3.0):
+        self.capture_delay = capture_delay
+        self.display_delay = display_delay
+        self.max_lead = max_lead
+        self.frame_interval = None # Average seconds between captured frames
+        self.latency = None        # Average seconds from capture to buffer swap
+        self._last_capture = None
+
+    """
+    Function Name: capture_time
+    Output: Returns the capture time of a frame
+    Input: Time cap.read() returned and the backend timestamp of the frame in seconds (cap.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+    Logic: The backend timestamp is used if it is plausible (see MAX_STAMP_AGE), otherwise the read time minus capture_delay
+    Example Call: t_capture = latency.capture_time(time.monotonic(), cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    """
+
+    def capture_time(self, t_read, stamp = None):
+        if stamp is not None and 0.0 <= t_read - stamp < MAX_STAMP_AGE:
+            return stamp
+        return t_read - self.capture_delay
+
+    """
+    Function Name: captured
+    Output: Updates the average frame interval
+    Input: Capture time of the frame (see capture_time())
+    Example Call: latency.captured(t_capture)
+    """
+
+    def captured(self, t):
+        if self._last_capture is not None:
+            interval = t - self._last_capture
+            if self.frame_interval is None:
+                self.frame_interval = interval
+            else:
+                self.frame_interval += SMOOTHING * (interval - self.frame_interval)
+        self._last_capture = t
+
+    """
+    Function Name: presented
+    Output: Updates the average pipeline latency
+    Input: Capture time of the frame and the time it was swapped to the screen
+    Example Call: latency.presented(t_capture, time.monotonic())
+    """
+
+    def presented(self, t_capture, t_present):
+        latency = t_present - t_capture
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += SMOOTHING * (latency - self.latency)
+
+    """
+    Function Name: lead
+    Output: Returns the number of frames between capture and display. 0 until both intervals have been measured
+    Example Call: frames = latency.lead()
+    """
+
+    def lead(self):
+        if not self.frame_interval or self.latency is None:
+            return 0.0
+        return min((self.latency + self.display_delay) / self.frame_interval, self.max_lead)
@@ -0,0 +1,53 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: LazyPool
+Global variables: MAX_WORKERS
+
+Persistent thread pool shared by pose.PoseSolver and detector.TiledDetector. OpenCV releases the GIL while it works,
+so its calls can run in parallel threads.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+"""
+Class Name: LazyPool
+Logic: Wraps a ThreadPoolExecutor that is only started by the first map() call and kept until close()
+Parameters: workers --> Number of threads
+            name --> Prefix of the thread names
+Example Call: pool = LazyPool(4, 'pose'); results = pool.map(function, items); pool.close()
+"""
+
+class LazyPool:
+
+    def __init__(self, workers = MAX_WORKERS, name = 'pool'):
+        self.workers = workers
+        self.name = name
+        self._executor = None
+
+    """
+    Function Name: map
+    Output: Returns the list of function(item) for every item, in order
+    Input: Function and list of items
+    Example Call: results = pool.map(lambda part: solve_poses(part, mtx, dist), parts)
+    """
+
+    def map(self, function, items):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = self.name)
+        return list(self._executor.map(function, items))
+
+    """
+    Function Name: close
+    Output: Shuts down the threads if they were started
+    Example Call: pool.close()
+    """
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
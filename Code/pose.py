@@ -0,0 +1,141 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: rodrigues, pose_matrices, solve_poses, PoseSolver
+Global variables: MARKER_LENGTH, PARALLEL_MIN_MARKERS, MIN_CHUNK
+"""
+
+import cv2.aruco as aruco
+import numpy as np
+import pool
+
+MARKER_LENGTH = 8.0 # Side of the marker in the units of the car model
+
+# Fan-out over threads. aruco.estimatePoseSingleMarkers already spreads the markers over OpenCV's own threads,
+# so an extra pool mostly oversubscribes the cores. It is off by default (PARALLEL_MIN_MARKERS = None).
+# No crossover has been measured; run bench_pose.py, which prints the smallest batch where the pool pays off on the machine,
+# and pass it as min_markers. MIN_CHUNK is the smallest number of markers given to one thread.
+PARALLEL_MIN_MARKERS = None
+MIN_CHUNK = 8
+
+"""
+Function name: rodrigues
+Output: Returns the rotation matrices (N x 3 x 3) of rotation vectors (N x 3)
+Logic: Rodrigues formula R = I + sin(theta) K + (1 - cos(theta)) K^2 for all vectors at once, where K is the
+       cross product matrix of the unit axis. Same result as cv2.Rodrigues for each vector
+Example call: R = rodrigues(rvecs)
+"""
+
+def rodrigues(rvecs):
+    theta = np.linalg.norm(rvecs, axis = 1)
+    axis = rvecs / np.where(theta > 1e-12, theta, 1.0)[:, None]
+    x, y, z = axis[:,0], axis[:,1], axis[:,2]
+    zero = np.zeros_like(x)
+
+    K = np.stack([
+        np.stack([zero, -z, y], axis = 1),
+        np.stack([z, zero, -x], axis = 1),
+        np.stack([-y, x, zero], axis = 1),
+    ], axis = 1)
+
+    s = np.sin(theta)[:, None, None]
+    c = np.cos(theta)[:, None, None]
+    return np.eye(3) + s * K + (1 - c) * np.matmul(K, K)
+
+"""
+Function name: pose_matrices
+Output: Returns the 4x4 model view matrices (N x 4 x 4) of the markers in OpenGL axes
+Input: rvecs and tvecs as returned by aruco.estimatePoseSingleMarkers (N x 1 x 3)
+Logic: Flips the y and z axes of OpenCV to those of OpenGL on the whole arrays and fills a preallocated array
+       with the rotation in the top left 3x3 block, tvec in the last column and [0,0,0,1] as last row
+Example call: matrices = pose_matrices(rvecs, tvecs)
+"""
+
+def pose_matrices(rvecs, tvecs):
+    rvecs = np.array(rvecs, dtype = np.float64).reshape(-1,3)
+    tvecs = np.array(tvecs, dtype = np.float64).reshape(-1,3)
+
+    # Fix axis
+    rvecs[:,1] = -rvecs[:,1]
+    tvecs[:,1:] = -tvecs[:,1:]
+
+    matrices = np.zeros((len(rvecs), 4, 4))
+    matrices[:, :3, :3] = rodrigues(rvecs)
+    matrices[:, :3, 3] = tvecs
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+"""
+Function name: solve_poses
+Output: Returns the 4x4 model view matrices (N x 4 x 4) of the markers
+Input: Vertices of the markers (N x 4 x 2), camera matrix and distortion coefficients
+Logic: One aruco.estimatePoseSingleMarkers call for all markers followed by pose_matrices()
+Example call: matrices = solve_poses(quads, mtx, dist)
+"""
+
+def solve_poses(quads, mtx, dist):
+    if len(quads) == 0:
+        return np.zeros((0, 4, 4))
+
+    corners = np.float32(quads).reshape(-1,1,4,2)
+    rvecs, tvecs, _ = aruco.estimatePoseSingleMarkers(list(corners), MARKER_LENGTH, mtx, dist)
+    return pose_matrices(rvecs, tvecs)
+
+"""
+Class Name: PoseSolver
+Logic: Solves the poses of many markers, optionally splitting them into chunks solved by a persistent thread pool (see pool.LazyPool).
+       Batches smaller than min_markers (and every batch if min_markers is None) are solved serially with solve_poses().
+       The results are the same as solve_poses() and in the same order.
+Parameters: workers --> Number of threads in the pool
+            min_markers --> Smallest batch solved in parallel. None never uses the pool
+            min_chunk --> Smallest number of markers given to one thread
+Example Call: solver = PoseSolver(); matrices = solver.solve(quads, mtx, dist)
+"""
+
+class PoseSolver:
+
+    def __init__(self, workers = pool.MAX_WORKERS, min_markers = PARALLEL_MIN_MARKERS, min_chunk = MIN_CHUNK):
+        self.workers = workers
+        self.min_markers = min_markers
+        self.min_chunk = min_chunk
+        self._pool = pool.LazyPool(workers, 'pose')
+
+    """
+    Function Name: chunks
+    Output: Returns the number of chunks a batch of n markers is split into. 1 means it is solved serially
+    Input: Number of markers
+    Example Call: n_chunks = solver.chunks(50)
+    """
+
+    def chunks(self, n):
+        if self.min_markers is None or self.workers < 2 or n < self.min_markers:
+            return 1
+        return max(1, min(self.workers, n // self.min_chunk))
+
+    """
+    Function Name: solve
+    Output: Returns the 4x4 model view matrices (N x 4 x 4) of the markers
+    Input: Vertices of the markers (N x 4 x 2), camera matrix and distortion coefficients
+    Logic: Splits the markers into contiguous chunks, solves each with solve_poses() on the pool and joins the results in order
+    Example Call: matrices = solver.solve(quads, mtx, dist)
+    """
+
+    def solve(self, quads, mtx, dist):
+        n_chunks = self.chunks(len(quads))
+        if n_chunks == 1:
+            return solve_poses(quads, mtx, dist)
+
+        bounds = np.linspace(0, len(quads), n_chunks + 1).astype(int)
+        parts = [quads[bounds[i]:bounds[i + 1]] for i in range(n_chunks)]
+
+        return np.concatenate(self._pool.map(lambda part: solve_poses(part, mtx, dist), parts))
+
+    """
+    Function Name: close
+    Output: Shuts down the thread pool if it was started
+    Example Call: solver.close()
+    """
+
+    def close(self):
+        self._pool.close()
@@ -0,0 +1,263 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: RenderState, GLCallCounter
+Global variables: BACKGROUND_DEPTH, ROTATE_Z_180
+
+Low overhead replacement for renderer.begin_frame(), draw_car() and end_frame().
+State that does not change between frames (texture filters, material, projection, background quad) is sent once,
+and enable / disable calls are only sent when the cached state differs.
+"""
+
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+import ctypes
+import numpy as np
+import renderer
+
+# Distance from the camera at which the background is drawn. Must lie between renderer.NEAR and renderer.FAR
+BACKGROUND_DEPTH = 500.0
+
+# The car model faces the other way, so every marker matrix is turned by 180 degrees about z (was glRotatef(180,0,0,1))
+ROTATE_Z_180 = np.diag([-1.0, -1.0, 1.0, 1.0])
+
+"""
+Class Name: RenderState
+Logic: Caches the GL state it sets. setup() sends the constant state once the GL context exists and reshape()
+       loads the projection built from the calibration. begin_frame() then only uploads the frame into a persistent texture,
+       draws the background from a vertex buffer and toggles the few capabilities that differ between background and cars.
+       invalidate() forgets the cache, eg. after other code changed GL state.
+Example Call: state = RenderState(); state.setup(); state.reshape(w, h, alpha, beta, cx, cy)
+"""
+
+class RenderState:
+
+    def __init__(self):
+        self.caps = {}
+        self.texture = None
+        self.texture_size = None
+        self.vbo = None
+        self.intrinsics = None
+        self.ready = False
+
+    """
+    Function Name: enable / disable
+    Output: Enables or disables a GL capability if the cached state differs
+    Input: GL capability eg. GL_LIGHTING
+    Example Call: state.enable(GL_DEPTH_TEST)
+    """
+
+    def enable(self, cap):
+        if self.caps.get(cap) is not True:
+            glEnable(cap)
+            self.caps[cap] = True
+
+    def disable(self, cap):
+        if self.caps.get(cap) is not False:
+            glDisable(cap)
+            self.caps[cap] = False
+
+    """
+    Function Name: setup
+    Output: Sends the state that stays the same for every frame
+    Logic: Creates the frame texture with its filters and the background vertex buffer, sets the material,
+           enables lighting and the client arrays and loads the projection if the calibration is known
+    Example Call: state.setup()
+    """
+
+    def setup(self):
+        self.caps = {}
+        self.texture_size = None
+
+        if self.texture is None:
+            self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+        self.enable(GL_LIGHT0)
+        self.enable(GL_COLOR_MATERIAL)
+        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.0,0.0,1.0,1.0])
+        # GL_FRONT_AND_BACK --> Specifies both front and back faces are updated
+
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 20, None)
+        glTexCoordPointer(2, GL_FLOAT, 20, ctypes.c_void_p(12))
+        # Each vertex is x, y, z, u, v as float32 ie. 20 bytes
+
+        if self.intrinsics is not None:
+            self.load_projection()
+
+        self.ready = True
+
+    """
+    Function Name: invalidate
+    Output: Forgets the cached state. setup() is called again before the next frame
+    Example Call: state.invalidate()
+    """
+
+    def invalidate(self):
+        self.ready = False
+
+    """
+    Function Name: reshape
+    Output: Sets the viewport and loads the projection for the camera intrinsics
+    Input: Width and height of the window and the camera intrinsics alpha (fx), beta (fy), cx and cy
+    Example Call: state.reshape(w, h, alpha, beta, cx, cy). Called from the glutReshapeFunc callback
+    """
+
+    def reshape(self, w, h, alpha, beta, cx, cy):
+        glViewport(0, 0, w, h)
+        self.intrinsics = (alpha, beta, cx, cy)
+        if self.ready:
+            self.load_projection()
+
+    """
+    Function Name: load_projection
+    Output: Loads the projection matrix once and fills the background vertex buffer
+    Logic: The background quad is placed at BACKGROUND_DEPTH so that through the projection it covers the whole screen.
+           This way the projection matrix never has to be switched during a frame
+    Example Call: state.load_projection()
+    """
+
+    def load_projection(self):
+        alpha, beta, cx, cy = self.intrinsics
+
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixd(np.ascontiguousarray(renderer.projection_matrix(alpha, beta, cx, cy).T))
+        glMatrixMode(GL_MODELVIEW)
+
+        x = BACKGROUND_DEPTH * cx / alpha
+        y = BACKGROUND_DEPTH * cy / beta
+        z = -BACKGROUND_DEPTH
+        quad = np.float32([
+            [-x, -y, z, 0.0, 1.0],
+            [ x, -y, z, 1.0, 1.0],
+            [ x,  y, z, 1.0, 0.0],
+            [-x,  y, z, 0.0, 0.0],
+        ])
+        glBufferData(GL_ARRAY_BUFFER, quad.nbytes, quad, GL_STATIC_DRAW)
+
+    """
+    Function Name: begin_frame
+    Output: Draws the captured frame as background
+    Input: RGB image
+    Logic: The texture is allocated when the frame size changes and only updated otherwise
+    Example Call: state.begin_frame(img)
+    """
+
+    def begin_frame(self, img):
+        if not self.ready:
+            self.setup()
+
+        h, w = img.shape[:2]
+        if self.texture_size != (w, h):
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img)
+            self.texture_size = (w, h)
+        else:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, w, h, GL_RGB, GL_UNSIGNED_BYTE, img)
+
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)  # Clear Buffer
+
+        self.disable(GL_DEPTH_TEST)
+        self.disable(GL_LIGHTING)
+        self.enable(GL_TEXTURE_2D)
+
+        glColor3f(1.0, 1.0, 1.0)    # Set texture Color. The car display lists change it
+        glLoadIdentity()
+        glDrawArrays(GL_QUADS, 0, 4)
+
+        self.enable(GL_DEPTH_TEST)
+        self.enable(GL_LIGHTING)
+        self.disable(GL_TEXTURE_2D)
+
+    """
+    Function Name: draw_car
+    Output: Draws a car with the given model view matrix
+    Input: 4x4 pose matrix of the marker and the display list picked by renderer.car_lod()
+    Logic: The 180 degree turn is folded into the matrix, so no push, rotate or pop is needed
+    Example Call: state.draw_car(m, car)
+    """
+
+    def draw_car(self, m, car):
+        glLoadMatrixd(np.ascontiguousarray(m.dot(ROTATE_Z_180).T))
+        glCallList(car)
+
+    """
+    Function Name: end_frame
+    Output: Shows the frame. glutSwapBuffers() already flushes, so glFlush() is not called
+    Example Call: state.end_frame()
+    """
+
+    def end_frame(self):
+        glutSwapBuffers()
+
+"""
+Class Name: GLCallCounter
+Logic: Counts the GL calls made from Python by replacing every gl* and glu* function (and glutSwapBuffers)
+       in the given modules with a counting wrapper. end_frame() closes the count of a frame under a label,
+       so the immediate mode and RenderState paths can be compared.
+Example Call: counter = GLCallCounter(renderer, render_state); ...; counter.end_frame('state'); print(counter.report())
+"""
+
+class GLCallCounter:
+
+    def __init__(self, *modules):
+        self.count = 0
+        self.frames = {}
+        self.originals = []
+
+        for module in modules:
+            for name in dir(module):
+                if not name.startswith('gl') or (name.startswith('glut') and name != 'glutSwapBuffers'):
+                    continue
+                function = getattr(module, name)
+                if callable(function):
+                    self.originals.append((module, name, function))
+                    setattr(module, name, self.wrap(function))
+
+    def wrap(self, function):
+        def counted(*args, **kwargs):
+            self.count += 1
+            return function(*args, **kwargs)
+        return counted
+
+    """
+    Function Name: end_frame
+    Output: Stores the number of calls made since the last end_frame() under a label and resets the count
+    Input: Label of the frame, eg. 'immediate' or 'state'
+    Example Call: counter.end_frame('state')
+    """
+
+    def end_frame(self, label):
+        self.frames.setdefault(label, []).append(self.count)
+        self.count = 0
+
+    """
+    Function Name: report
+    Output: Returns a line per label with the number of frames and the mean, minimum and maximum GL calls per frame
+    Example Call: print(counter.report())
+    """
+
+    def report(self):
+        lines = []
+        for (label, counts) in sorted(self.frames.items()):
+            lines.append("%-10s %5d frames  %7.1f GL calls/frame (min %d, max %d)" % (label, len(counts), np.mean(counts), min(counts), max(counts)))
+        return "\n".join(lines)
+
+    """
+    Function Name: uninstall
+    Output: Puts the original GL functions back
+    Example Call: counter.uninstall()
+    """
+
+    def uninstall(self):
+        for (module, name, function) in self.originals:
+            setattr(module, name, function)
+        self.originals = []
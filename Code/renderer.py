@@ -0,0 +1,740 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: max_area, drawCar, drawBox, drawCarProxy, build_car_lods, select_lod, in_view, car_lod, projection_matrix, begin_frame, draw_car, end_frame, reshape, open_window
+Global variables: windowWidth, windowHeight, FAR, NEAR, LOD_SLICES, LOD_AREAS, LOD_MIN_AREA, car_lists
+"""
+
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+import numpy as np
+import sys
+
+windowWidth = 800
+windowHeight = 600
+
+FAR = 1000.0 # Far clipping distance
+NEAR = 1.0   # Near clipping distance
+
+# Level of detail of the car. A marker with bounding box area (in screen pixels) >= LOD_AREAS[i] is drawn with LOD_SLICES[i] wheel slices.
+# Smaller markers get the box proxy and markers below LOD_MIN_AREA are not drawn at all.
+# The frame is stretched over the window, so image areas are scaled to the window before they are compared.
+LOD_SLICES = (15, 8)
+LOD_AREAS = (6000, 1500)
+LOD_MIN_AREA = 100
+car_lists = [] # Display list ids filled by build_car_lods()
+
+"""
+Function name: max_area
+Output: Returns the area of maximum bounding rectangle of a quadrilateral
+Input: Vertices of quadrilateral
+Logic: Area is product of difference of width and height
+Example call: area = max_area(quad)
+"""
+
+def max_area(quad):
+    quad = np.float32(quad)
+    return ((max(quad[:,0]) - min(quad[:,0])) * (max(quad[:,1]) - min(quad[:, 1])))        
+
+"""
+Function name: drawCar
+Output: Draws the car in 3d using OpenGL functions
+Input: Number of slices used to tessellate the wheels (default 15)
+Logic: Draws using glBegin() and glEnd()
+Example call: drawCar() or drawCar(8)
+"""
+
+def drawCar(slices = 15):
+	z = 1.5
+    
+	# Back window frame    
+	glColor3f(206/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 0.25, -z)
+	glVertex3f(-3.0, 0.25, z)
+	glVertex3f(-3.0, -1.0, z)
+	glVertex3f(-3.0, -1.0, -z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.5, -z)
+	glVertex3f(-3.0, 1.5, z)
+	glVertex3f(-3.0, 1.0, z)
+	glVertex3f(-3.0, 1.0, -z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 0.25, -z)
+	glVertex3f(-3.0, 0.25, -z+0.5)
+	glVertex3f(-3.0, 1.0, -z+0.5)
+	glVertex3f(-3.0, 1.0, -z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 0.25, z-0.5)
+	glVertex3f(-3.0, 0.25, z)
+	glVertex3f(-3.0, 1.0, z)
+	glVertex3f(-3.0, 1.0, z-0.5)
+	glEnd()
+
+	# Top
+	glColor3f(240/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.5, -z)
+	glVertex3f(-3.0, 1.5, z)
+	glVertex3f(0.6, 1.5, z)
+	glVertex3f(0.6, 1.5, -z)
+	glEnd()
+
+	# Bottom
+	glColor3f(190/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, -1.0, -z)
+	glVertex3f(-3.0, -1.0, z)
+	glVertex3f(3.0, -1.0, z)
+	glVertex3f(3.0, -1.0, -z)
+	glEnd()
+
+	# Front
+	glColor3f(206/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(3.0, -1.0, -z)
+	glVertex3f(3.0, 0.15, -z)
+	glVertex3f(3.0, 0.15, z)
+	glVertex3f(3.0, -1.0, z)
+
+	# Lamp
+	glColor3f(0.9,0.9,0.9)
+	glVertex3f(3.006, -0.65, -z+0.101)
+	glVertex3f(3.006, -0.35, -z+0.101)
+	glVertex3f(3.006, -0.35, -z+0.601)
+	glVertex3f(3.006, -0.65, -z+0.601)
+
+	glVertex3f(3.006, -0.65, z-0.101)
+	glVertex3f(3.006, -0.35, z-0.101)
+	glVertex3f(3.006, -0.35, z-0.601)
+	glVertex3f(3.006, -0.65, z-0.601)
+
+	glColor3f(0,0,0)
+	glVertex3f(3.006, -0.6, -z+1)
+	glVertex3f(3.006, -0.37, -z+1)
+	glVertex3f(3.006, -0.37, z-1)
+	glVertex3f(3.006, -0.6, z-1)
+	
+	# Lamp2
+	glColor3f(0.6,0.6,0.6)
+	glVertex3f(3.005, -0.7, -z)
+	glVertex3f(3.005, -0.3, -z)
+	glVertex3f(3.005, -0.3, z)
+	glVertex3f(3.005, -0.7, z)
+
+	glVertex3f(2.9, -0.3, -z-0.0014)
+	glVertex3f(3.0, -0.3, -z-0.0014)
+	glVertex3f(3.0, -0.7, -z-0.0014)
+	glVertex3f(2.9, -0.7, -z-0.0014)
+
+	glVertex3f(2.9, -0.3, z+0.0014)
+	glVertex3f(3.0, -0.3, z+0.0014)
+	glVertex3f(3.0, -0.7, z+0.0014)
+	glVertex3f(2.9, -0.7, z+0.0014)
+	
+	glColor3f(226/255, 152/255, 22/255)
+	glVertex3f(2.95, -0.35, z+0.0015)
+	glVertex3f(2.985, -0.35, z+0.0015)
+	glVertex3f(2.985, -0.65, z+0.0015)
+	glVertex3f(2.95, -0.65, z+0.0015)
+
+	glVertex3f(2.95, -0.35, -z-0.0015)
+	glVertex3f(2.985, -0.35, -z-0.0015)
+	glVertex3f(2.985, -0.65, -z-0.0015)
+	glVertex3f(2.95, -0.65, -z-0.0015)
+	glEnd()
+
+	# Front cover
+	glColor3f(230/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(3.0, 0.15, -z)
+	glVertex3f(1.2, 0.25, -z)
+	glVertex3f(1.2, 0.25, z)
+	glVertex3f(3.0, 0.15, z)
+	glEnd()
+
+	# Front window frame
+	glColor3f(235/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(0.6, 1.5, -z)
+	glVertex3f(0.6, 1.5, z)
+	glVertex3f(0.65, 1.42, z)
+	glVertex3f(0.65, 1.42, -z)
+
+	glVertex3f(1.15, 0.34, -z)
+	glVertex3f(1.15, 0.34, -z+0.1)
+	glVertex3f(0.65, 1.42, -z+0.1)
+	glVertex3f(0.65, 1.42, -z)
+
+	glVertex3f(1.15, 0.34, z)
+	glVertex3f(1.15, 0.34, z-0.1)
+	glVertex3f(0.65, 1.42, z-0.1)
+	glVertex3f(0.65, 1.42, z)
+
+	glVertex3f(1.15, 0.34, -z)
+	glVertex3f(1.15, 0.34, z)
+	glVertex3f(1.2, 0.25, z)
+	glVertex3f(1.2, 0.25, -z)
+	glEnd()
+
+	# Left above (window frame part)
+	glColor3f(206/255, 20/255, 55/255)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.5, -z)
+	glVertex3f(0.6, 1.5, -z)
+	glVertex3f(0.696, 1.3, -z)
+	glVertex3f(-3.0, 1.3, -z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.3, -z)
+	glVertex3f(-3.0, 0.25, -z)
+	glVertex3f(-2.5, 0.25, -z)
+	glVertex3f(-2.5, 1.3, -z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-1.2, 1.3, -z)
+	glVertex3f(-1.2, 0.25, -z)
+	glVertex3f(-1.0, 0.25, -z)
+	glVertex3f(-1.0, 1.3, -z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(1.2, 0.25, -z)
+	glVertex3f(0.696, 1.3, -z)
+	glVertex3f(0.496, 1.3, -z)
+	glVertex3f(1.0, 0.25, -z)
+	glEnd()
+
+	# Left front door
+	glBegin(GL_POLYGON)
+	glVertex3f(1.2, 0.25, -z)
+	glVertex3f(3.0, 0.15, -z)
+	glVertex3f(3.0, -1.0, -z)
+	glVertex3f(1.2, -1.0, -z)
+	glEnd()
+
+	# Left back door
+	glBegin(GL_POLYGON)
+	glVertex3f(1.2, 0.25, -z)
+	glVertex3f(1.2, -1.0, -z)
+	glVertex3f(-3.0, -1.0, -z)
+	glVertex3f(-3.0, 0.25, -z)
+	glEnd()
+
+	# Right back door
+	glBegin(GL_POLYGON)
+	glVertex3f(1.2, 0.25, z)
+	glVertex3f(1.2, -1.0, z)
+	glVertex3f(-3.0, -1.0, z)
+	glVertex3f(-3.0, 0.25, z)
+	glEnd()
+
+	# Right front door
+	glBegin(GL_POLYGON)
+	glVertex3f(1.2, 0.25, z)
+	glVertex3f(3.0, 0.15, z)
+	glVertex3f(3.0, -1.0, z)
+	glVertex3f(1.2, -1.0, z)
+	glEnd()
+
+	# Right above (window frame part)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.5, z)
+	glVertex3f(0.6, 1.5, z)
+	glVertex3f(0.696, 1.3, z)
+	glVertex3f(-3.0, 1.3, z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.3, z)
+	glVertex3f(-3.0, 0.25, z)
+	glVertex3f(-2.5, 0.25, z)
+	glVertex3f(-2.5, 1.3, z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(-1.2, 1.3, z)
+	glVertex3f(-1.2, 0.25, z)
+	glVertex3f(-1.0, 0.25, z)
+	glVertex3f(-1.0, 1.3, z)
+	glEnd()
+
+	glBegin(GL_QUADS)
+	glVertex3f(1.2, 0.25, z)
+	glVertex3f(0.696, 1.3, z)
+	glVertex3f(0.496, 1.3, z)
+	glVertex3f(1.0, 0.25, z)
+	glEnd()
+
+	# Side bottom
+	glColor3f(165/255, 8/255, 37/255)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, -0.3, -z-0.0013)
+	glVertex3f(3.0, -0.3, -z-0.0013)
+	glVertex3f(3.0, -0.7, -z-0.0013)
+	glVertex3f(-3.0, -0.7, -z-0.0013)
+
+	glVertex3f(-3.0, -0.3, z+0.0013)
+	glVertex3f(3.0, -0.3, z+0.0013)
+	glVertex3f(3.0, -0.7, z+0.0013)
+	glVertex3f(-3.0, -0.7, z+0.0013)
+	glEnd()
+
+	# Left mirror
+	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+	glEnable(GL_BLEND)
+	glColor4f(190/255, 190/255, 190/255, 0.6)
+	glBegin(GL_QUADS)
+	glVertex3f(0.85, 0.5, -z-0.4)
+	glVertex3f(0.85, 0.5, -z)
+	glVertex3f(0.85, 0.25, -z)
+	glVertex3f(0.85, 0.25, -z-0.4)
+	glEnd()
+	glDisable(GL_BLEND)
+
+	glColor3f(180/255, 30/255, 30/255)
+	glBegin(GL_QUADS)
+	glVertex3f(0.85, 0.5, -z-0.4)
+	glVertex3f(1, 0.5, -z-0.4)
+	glVertex3f(1, 0.25, -z-0.4)
+	glVertex3f(0.85, 0.25, -z-0.4)
+
+	glVertex3f(0.85, 0.5, -z-0.4)
+	glVertex3f(0.85, 0.5, -z)
+	glVertex3f(1, 0.5, -z)
+	glVertex3f(1, 0.5, -z-0.4)
+
+	glVertex3f(1, 0.5, -z-0.4)
+	glVertex3f(1, 0.5, -z)
+	glVertex3f(1, 0.25, -z)
+	glVertex3f(1, 0.25, -z-0.4)
+
+	glVertex3f(0.85, 0.5, -z)
+	glVertex3f(1, 0.5, -z)
+	glVertex3f(1, 0.25, -z)
+	glVertex3f(0.85, 0.25, -z)
+
+	glVertex3f(0.85, 0.25, -z-0.4)
+	glVertex3f(0.85, 0.25, -z)
+	glVertex3f(1, 0.25, -z)
+	glVertex3f(1, 0.25, -z-0.4)
+
+	glEnd()
+
+	# Right mirror
+	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+	glEnable(GL_BLEND)
+	glColor4f(190/255, 190/255, 190/255, 0.6)
+	glBegin(GL_QUADS)
+	glVertex3f(0.85, 0.5, z+0.4)
+	glVertex3f(0.85, 0.5, z)
+	glVertex3f(0.85, 0.25, z)
+	glVertex3f(0.85, 0.25, z+0.4)
+	glEnd()
+	glDisable(GL_BLEND)
+
+	glColor3f(180/255, 30/255, 30/255)
+	glBegin(GL_QUADS)
+	glVertex3f(0.85, 0.5, z+0.4)
+	glVertex3f(1, 0.5, z+0.4)
+	glVertex3f(1, 0.25, z+0.4)
+	glVertex3f(0.85, 0.25, z+0.4)
+
+	glVertex3f(1, 0.5, z+0.4)
+	glVertex3f(1, 0.5, z)
+	glVertex3f(1, 0.25, z)
+	glVertex3f(1, 0.25, z+0.4)
+
+	glVertex3f(0.85, 0.5, z+0.4)
+	glVertex3f(0.85, 0.5, z)
+	glVertex3f(1, 0.5, z)
+	glVertex3f(1, 0.5, z+0.4)
+
+	glVertex3f(0.85, 0.5, z)
+	glVertex3f(1, 0.5, z)
+	glVertex3f(1, 0.25, z)
+	glVertex3f(0.85, 0.25, z)
+
+	glVertex3f(0.85, 0.25, z+0.4)
+	glVertex3f(0.85, 0.25, z)
+	glVertex3f(1, 0.25, z)
+	glVertex3f(1, 0.25, z+0.4)
+	glEnd()
+
+	# Left window glass
+	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+	glEnable(GL_BLEND)
+	glColor4f(90/255, 90/255, 90/255, 0.3)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.5, -z+0.01)
+	glVertex3f(0.5, 1.5, -z+0.01)
+	glVertex3f(1.2, 0.25, -z+0.01)
+	glVertex3f(-3.0, 0.25, -z+0.01)
+	glEnd()
+	glDisable(GL_BLEND)
+	
+	# Right window glass
+	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+	glEnable(GL_BLEND)
+	glColor4f(90/255, 90/255, 90/255, 0.3)
+	glBegin(GL_QUADS)
+	glVertex3f(-3.0, 1.5, z-0.01)
+	glVertex3f(0.5, 1.5, z-0.01)
+	glVertex3f(1.2, 0.25, z-0.01)
+	glVertex3f(-3.0, 0.25, z-0.01)
+	glEnd()
+	glDisable(GL_BLEND)
+
+	# Front window glass
+	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+	glEnable(GL_BLEND)
+	glColor4f(90/255, 90/255, 90/255, 0.3)
+	glBegin(GL_QUADS)
+	glVertex3f(0.5, 1.5, -z)
+	glVertex3f(0.5, 1.5, z)
+	glVertex3f(1.2, 0.25, z)
+	glVertex3f(1.2, 0.25, -z)
+	glEnd()
+	glDisable(GL_BLEND)
+
+	#back window glass
+	glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+	glEnable(GL_BLEND)
+	glColor4f(90/255, 90/255, 90/255, 0.3)
+	glBegin(GL_QUADS)
+	glVertex3f(-2.99, 0.25, -z+0.5)
+	glVertex3f(-2.99, 0.25, z-0.5)
+	glVertex3f(-2.99, 1.0, z-0.5)
+	glVertex3f(-2.99, 1.0, -z+0.5)
+	glEnd()
+	glDisable(GL_BLEND)
+
+	# Car's Wheel
+	glColor3f(0.0, 0.0, 0.0)
+	quadric = gluNewQuadric()
+	gluQuadricNormals(quadric, GLU_SMOOTH)
+	gluQuadricTexture(quadric, GL_TRUE)
+	glTranslatef(1.7,-1.0,-1.7)
+	gluCylinder(quadric,0.6,0.6,0.2,slices,slices)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	glTranslatef(0.0,0.0,0.2)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	
+	glTranslatef(0.0, 0.0, -0.2)
+	glTranslatef(-3.3, 0.0, 0.0)
+	gluCylinder(quadric,0.6,0.6,0.2,slices,slices)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	glTranslatef(0.0,0.0,0.2)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	
+	glTranslatef(0.0, 0.0, -0.2)
+	glTranslatef(0.0, 0.0, 3.2)
+	gluCylinder(quadric,0.6,0.6,0.2,slices,slices)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	glTranslatef(0.0,0.0,0.2)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	
+	glTranslatef(0.0, 0.0, -0.2)
+	glTranslatef(3.3, 0.0, 0.0)
+	gluCylinder(quadric,0.6,0.6,0.2,slices,slices)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	glTranslatef(0.0,0.0,0.2)
+	gluDisk(quadric, 0, 0.6, slices, slices)
+	
+	glColor3f(1.0, 1.0, 1.0)
+	gluDisk(quadric, 0.2, 0.4, slices, slices)
+	glTranslatef(-3.3, 0.0, 0.0)
+	gluDisk(quadric, 0.2, 0.4, slices, slices)
+	glTranslatef(0.0, 0.0, -0.2)
+	glTranslatef(0.0, 0.0, -3.2)
+	gluDisk(quadric, 0.2, 0.4, slices, slices)
+	glTranslatef(+3.3, 0.0, 0.0)
+	gluDisk(quadric, 0.2, 0.4, slices, slices)    
+
+"""
+Function name: drawBox
+Output: Draws a closed axis aligned box
+Input: Two opposite corners (x0, y0, z0) and (x1, y1, z1)
+Logic: Draws the six faces with glBegin(GL_QUADS)
+Example call: drawBox(-3.0, -1.0, -1.5, 3.0, 0.25, 1.5)
+"""
+
+def drawBox(x0, y0, z0, x1, y1, z1):
+	glBegin(GL_QUADS)
+	for a in (z0, z1):
+		glVertex3f(x0, y0, a)
+		glVertex3f(x1, y0, a)
+		glVertex3f(x1, y1, a)
+		glVertex3f(x0, y1, a)
+	for a in (x0, x1):
+		glVertex3f(a, y0, z0)
+		glVertex3f(a, y1, z0)
+		glVertex3f(a, y1, z1)
+		glVertex3f(a, y0, z1)
+	for a in (y0, y1):
+		glVertex3f(x0, a, z0)
+		glVertex3f(x1, a, z0)
+		glVertex3f(x1, a, z1)
+		glVertex3f(x0, a, z1)
+	glEnd()
+
+"""
+Function name: drawCarProxy
+Output: Draws a cheap stand-in for the car used for small markers
+Logic: Two boxes for the body and the cabin, wheels included in the body height
+Example call: drawCarProxy()
+"""
+
+def drawCarProxy():
+	z = 1.5
+
+	glColor3f(206/255, 20/255, 55/255)
+	drawBox(-3.0, -1.6, -z, 3.0, 0.25, z)
+	drawBox(-3.0, 0.25, -z, 0.6, 1.5, z)
+
+"""
+Function name: build_car_lods
+Output: Compiles one display list per level of detail and stores their ids in car_lists
+Logic: Levels in LOD_SLICES use drawCar() with fewer wheel slices, the last level is drawCarProxy().
+       Must be called once after the GL window is created
+Example call: build_car_lods()
+"""
+
+def build_car_lods():
+    global car_lists
+
+    base = glGenLists(len(LOD_SLICES) + 1)
+    car_lists = [base + i for i in range(len(LOD_SLICES) + 1)]
+
+    for (lod, slices) in enumerate(LOD_SLICES):
+        glNewList(car_lists[lod], GL_COMPILE)
+        drawCar(slices)
+        glEndList()
+
+    glNewList(car_lists[-1], GL_COMPILE)
+    drawCarProxy()
+    glEndList()
+
+"""
+Function name: select_lod
+Output: Returns the level of detail index for a marker (0 is the most detailed), or None if it should be culled
+Input: Vertices of the marker in image coordinates and the screen pixels covered by one image pixel
+Logic: Compares the on-screen area, max_area() of the marker times scale, with LOD_AREAS. Below LOD_MIN_AREA the marker is culled
+Example call: lod = select_lod(marker_details['vertices'], (800 / 4000) * (600 / 3000))
+"""
+
+def select_lod(quad, scale = 1.0):
+    area = max_area(quad) * scale
+    if area < LOD_MIN_AREA:
+        return None
+
+    for (lod, threshold) in enumerate(LOD_AREAS):
+        if area >= threshold:
+            return lod
+
+    return len(LOD_AREAS)
+
+"""
+Function name: in_view
+Output: Returns True if the car drawn on the marker can be visible in an image of size w x h
+Input: Vertices of the marker in image coordinates, width and height of the image
+Logic: The bounding box of the marker is grown by its own size (the car overhangs the marker) and tested for overlap with the image
+Example call: if in_view(marker, w, h): ...
+"""
+
+def in_view(quad, w, h):
+    quad = np.float32(quad)
+    x0, y0 = quad.min(axis = 0)
+    x1, y1 = quad.max(axis = 0)
+    mx = x1 - x0
+    my = y1 - y0
+    return x1 + mx >= 0 and x0 - mx <= w and y1 + my >= 0 and y0 - my <= h
+
+"""
+Function name: car_lod
+Output: Returns the display list to draw for a marker, or None if the marker is culled
+Input: Vertices of the marker in image coordinates, width and height of the image and of the window it is shown in
+Logic: Skips markers outside the view with in_view() and picks a display list with select_lod() from the area on screen
+Example call: car = car_lod(marker, w, h, window_w, window_h)
+"""
+
+def car_lod(quad, w, h, window_w = windowWidth, window_h = windowHeight):
+    if not in_view(quad, w, h):
+        return None
+
+    lod = select_lod(quad, (window_w / float(w)) * (window_h / float(h)))
+    if lod is None:
+        return None
+
+    return car_lists[lod]
+
+"""
+Function name: projection_matrix
+Output: Returns the 4x4 projection matrix of the camera
+Input: Camera intrinsics alpha (fx), beta (fy), cx and cy, and the far and near clipping distances
+Example call: m1 = projection_matrix(alpha, beta, cx, cy)
+"""
+
+def projection_matrix(alpha, beta, cx, cy, f = FAR, n = NEAR):
+
+    ## Make projection matrix
+
+    return np.array([
+    [(alpha)/cx, 0, 0, 0],
+    [0, beta/cy, 0, 0],
+    [0, 0, -(f+n)/(f-n), (-2.0*f*n)/(f-n)],
+    [0,0,-1,0],
+    ])
+
+"""
+Function name: begin_frame
+Output: Draws the captured frame as background and sets up the projection for the cars. Immediate mode version of render_state.RenderState.begin_frame()
+Input: RGB image and the camera intrinsics alpha (fx), beta (fy), cx and cy
+Logic: The frame is uploaded as a texture and drawn on a full screen quad. The projection matrix is built from the camera matrix
+Example call: begin_frame(img, alpha, beta, cx, cy)
+"""
+
+def begin_frame(img, alpha, beta, cx, cy):
+    h, w = img.shape[:2]
+
+    # This draws the 2d projected on the screen
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img)
+    
+    # Enable / Disable
+    glDisable(GL_DEPTH_TEST)    # Disable GL_DEPTH_TEST
+    glDisable(GL_LIGHTING)      # Disable Light
+    glDisable(GL_LIGHT0)        # Disable Light
+    glEnable(GL_TEXTURE_2D)     # Enable texture map
+    
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)  # Clear Buffer
+    glColor3f(1.0, 1.0, 1.0)    # Set texture Color(RGB: 0.0 ~ 1.0)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    glPushMatrix()
+
+    glBegin(GL_QUADS)
+    
+    glTexCoord2d(0.0, 1.0)
+    glVertex3d(-1.0, -1.0,  0)
+    glTexCoord2d(1.0, 1.0)
+    glVertex3d( 1.0, -1.0,  0)
+    glTexCoord2d(1.0, 0.0)
+    glVertex3d( 1.0,  1.0,  0)
+    glTexCoord2d(0.0, 0.0)
+    glVertex3d(-1.0,  1.0,  0)
+    
+    glEnd()
+
+    glPopMatrix()
+    
+    # Enable / Disable
+    glEnable(GL_DEPTH_TEST)     # Enable GL_DEPTH_TEST
+    glEnable(GL_LIGHTING)       # Enable Light
+    glEnable(GL_LIGHT0)         # Enable Light
+    glDisable(GL_TEXTURE_2D)    # Disable texture map
+    glEnable(GL_COLOR_MATERIAL)
+
+    m1 = projection_matrix(alpha, beta, cx, cy)
+    glLoadMatrixd(m1.T)
+
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+
+    # Push Projection of frame
+    glPushMatrix()
+    
+    glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.0,0.0,1.0,1.0])
+    # GL_FRONT_AND_BACK --> Specifies both front and back faces are updated
+
+"""
+Function name: draw_car
+Output: Draws a car with the given model view matrix
+Input: 4x4 pose matrix of the marker and the display list picked by car_lod()
+Example call: draw_car(m, car)
+"""
+
+def draw_car(m, car):
+    glPushMatrix()
+    glLoadMatrixd(m.T)
+    glRotatef(180,0,0,1)
+    
+    glTranslatef(0,0,0)
+
+    # Draws the car
+    glCallList(car)
+    
+    glPopMatrix()
+
+"""
+Function name: end_frame
+Output: Shows the frame drawn since begin_frame()
+Example call: end_frame()
+"""
+
+def end_frame():
+    glPopMatrix()
+
+    # To update the screen
+    glFlush()
+    glutSwapBuffers()
+
+"""
+Function name: reshape
+Output: Changes the window size of the output window
+Input: width and height
+Example call: reshape(width, height). In OpenGL main loop it is called as glutReshapeFunc(reshape)
+"""
+   
+def reshape(w, h):
+    glViewport(0, 0, w, h)
+    glLoadIdentity()
+    glOrtho(-w / windowWidth, w / windowWidth, -h / windowHeight, h / windowHeight, -1.0, 1.0)
+
+"""
+Function name: open_window
+Output: Creates the GL window, registers the callbacks and compiles the car display lists
+Input: Window title and the display, keyboard, idle and reshape callbacks
+Example call: open_window("Aruco Tracker", app.draw, app.keyboard, app.idle, app.reshape)
+"""
+
+def open_window(title, display, keyboard, idle, reshape = reshape):
+
+	# Initialize OpenGL window
+    glutInitWindowPosition(0,0)
+    glutInitWindowSize(windowWidth, windowHeight)
+    glutInit(sys.argv)    
+    glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE | GLUT_DEPTH)
+    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)    
+    glutCreateWindow(title)
+
+    # Compile the car display lists once the GL context exists
+    build_car_lods()
+
+    # Displays the image and car in draw. It is called till the program ends    
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+
+    # To quit the window when 'q' is pressed
+    glutKeyboardFunc(keyboard)
+    glClearColor(0.0, 0.0, 0.0, 1.0)
+
+    # Enable lighting for 2d background projection
+    glEnable(GL_DEPTH_TEST)
+    glEnable(GL_LIGHTING)
+    glEnable(GL_LIGHT0)
+
+    # Idle function is called when the screen is idle ie. when video is over and window is open    
+    glutIdleFunc(idle)
@@ -0,0 +1,293 @@
+"""
+Author: Eswara prasad
+Domain: Signal Processing and ML
+Sub-domain: Image processing
+Functions: mean, mean_arr, add_velocity_values, new_track, TrackManager, square, self_check
+Global variables: MAX_SAVED_VELOCITIES, MAX_AGE, MAX_TRACKS, DRAW_CONFIDENCE
+"""
+
+from collections import OrderedDict
+import numpy as np
+
+MAX_SAVED_VELOCITIES = 50 # Number of frames over which the average velocity of a vertex is computed
+MAX_AGE = 100             # Frames a track may stay unseen before it is removed
+MAX_TRACKS = 64           # Maximum number of live tracks
+
+# Predicted tracks are drawn only while their confidence is at least DRAW_CONFIDENCE.
+# With the default decay of 0.97 this stops drawing after 40 unseen frames, while the track is kept until MAX_AGE for re-identification.
+DRAW_CONFIDENCE = 0.3
+
+"""
+Function Name: mean
+Output: Return the mean of a list
+Logic: Sum of values divided the number of elements
+Example Call: mean = mean(arr)
+"""
+
+def mean(arr):
+    return sum(arr)/float(len(arr))
+
+"""
+Function Name: mean_arr(arr)
+Output: Returns the mean of list of vertices of quadrilateral (ie. list of tuples) as a tuple
+Logic: Calls mean(arr) for list of tuples
+Example Call: average = mean_arr(arr)
+"""
+
+def mean_arr(arr):
+
+    return (mean(arr[:,0]),mean(arr[:,1]))
+    # Traversing through x and y of each vertex and calling mean of the obtained list
+
+"""
+Function Name: add_velocity_values
+Output: Adds present velocity to saved list, computes average velocity of each vertex and returns the new saved list
+Input: Saved velocities, present velocity, average velocity (updated in place) and the number of velocities to keep
+Logic: Calls mean_arr for each vertex (list of tuples)
+Example Call: saved_velocities = add_velocity_values(saved_velocities, values, average_velocity)
+"""
+
+def add_velocity_values(saved, values, average, limit = MAX_SAVED_VELOCITIES):
+    values = np.float32([values])
+    if(len(saved) <= limit):
+        saved = np.concatenate((saved, values)) # Saves velocities for the last limit frames
+    if(len(saved) > limit):
+        saved = saved[1:] # If more than limit values are stored pop first element to make the length limit again
+
+    for i in range(4):
+        average[i] = mean_arr(saved[:,i])
+        # First obtain list of each vertex in saved list eg. saved[:,2] returns the list of third vertex coordinates
+
+    return saved
+
+"""
+Function Name: new_track
+Output: Returns the details of a marker seen for the first time
+Input: Vertices of the marker
+Example Call: track = new_track(marker)
+"""
+
+def new_track(marker):
+    return {'vertices':marker, 'av_velocity':np.float32([(0, 0),(0, 0),(0, 0),(0, 0)]), 'saved_velocities':np.zeros((0,4,2),dtype=np.float32), 'seen':True, 't':0, 'confidence':1.0}
+    # Here t denotes the time it is unseen. It is 0 as long as it is seen
+    # confidence is 1 while the marker is detected and decays every frame it is only predicted
+
+"""
+Class Name: TrackManager
+Logic: Keeps the details of every tracked marker in seen_ids, an OrderedDict keyed by marker ID and ordered from least to most recently seen.
+       update() is called with the detections of a frame, predicted() gives the tracks to draw from their estimated vertices
+       and step() advances the unseen tracks to the next frame. Tracks are updated and evicted in place.
+Parameters: max_age --> Number of frames a track may stay unseen before it is removed
+            max_tracks --> Maximum number of live tracks. The least recently seen track not detected in this frame is evicted when a new one
+                           does not fit. A frame with more markers keeps them all, and the extra tracks are trimmed by step() once they go unseen
+            jitter --> Largest velocity (pixels per frame) of a vertex accepted as real motion. Faster motion is treated as shake
+            decay --> Factor the confidence of a track is multiplied with for every unseen frame
+            draw_confidence --> Predicted tracks below this confidence are no longer given by predicted()
+            min_confidence --> Tracks whose confidence falls below this are removed. 0 leaves eviction to max_age
+            history --> Number of frames the average velocity is computed over
+Example Call: tracks = TrackManager(max_age = 100, max_tracks = 64)
+"""
+
+class TrackManager:
+
+    def __init__(self, max_age = MAX_AGE, max_tracks = MAX_TRACKS, jitter = 40.0, decay = 0.97, draw_confidence = DRAW_CONFIDENCE, min_confidence = 0.0, history = MAX_SAVED_VELOCITIES):
+        self.max_age = max_age
+        self.max_tracks = max_tracks
+        self.jitter = jitter
+        self.decay = decay
+        self.draw_confidence = draw_confidence
+        self.min_confidence = min_confidence
+        self.history = history
+        self.seen_ids = OrderedDict()
+
+    def __len__(self):
+        return len(self.seen_ids)
+
+    def __contains__(self, m_id):
+        return m_id in self.seen_ids
+
+    def __getitem__(self, m_id):
+        return self.seen_ids[m_id]
+
+    """
+    Function Name: update
+    Output: Adds or updates the track of every detected marker
+    Input: Vertices of the detected markers (N x 4 x 2) and their IDs (N)
+    Logic: Velocity of each vertex is its displacement since the last frame. If any vertex moved more than jitter
+           the average velocity is kept instead. Seen tracks move to the end of seen_ids so that the first one is the least recently seen
+    Example Call: tracks.update(markers, ids)
+    """
+
+    def update(self, markers, ids):
+        if ids is None:
+            return
+
+        for (marker, m_id) in zip(markers, ids):
+
+            if m_id not in self.seen_ids:
+                self.seen_ids[m_id] = new_track(marker)
+                # If the Marker ID is seen for the first time or again after it was evicted, it is added to seen_ids.
+
+                if len(self.seen_ids) > self.max_tracks:
+                    self.evict()
+                continue
+
+            marker_details = self.seen_ids[m_id]
+            new_velocity = np.float32(marker - marker_details['vertices'])
+
+            if np.abs(new_velocity).max() > self.jitter:
+                # If the velocity is too high (shaky) replace it with average velocity
+                new_velocity = marker_details['av_velocity'].copy()
+
+            marker_details['saved_velocities'] = add_velocity_values(marker_details['saved_velocities'], new_velocity, marker_details['av_velocity'], self.history)
+            # Calls add_velocity_values for saving current velocity and computing average velocity
+
+            marker_details['vertices'] = marker
+            marker_details['seen'] = True
+            marker_details['t'] = 0
+            marker_details['confidence'] = 1.0
+            self.seen_ids.move_to_end(m_id)
+
+    """
+    Function Name: evict
+    Output: Removes the least recently seen track that was not detected in this frame. Nothing is removed if every track is current
+    Logic: Tracks updated earlier in the same frame are never evicted, so crowded frames do not reset their velocities
+    Example Call: tracks.evict()
+    """
+
+    def evict(self):
+        for (m_id, marker_details) in self.seen_ids.items():
+            if not marker_details['seen']:
+                del self.seen_ids[m_id]
+                return
+
+    """
+    Function Name: predicted
+    Output: Yields (ID, details) of the tracks not detected in this frame that should still be drawn
+    Input: Width and height of the image
+    Logic: A predicted track is drawn only while its confidence is at least draw_confidence and the centre of its vertices lies inside the image
+    Example Call: for (m_id, marker_details) in tracks.predicted(w, h): ...
+    """
+
+    def predicted(self, w, h):
+        for (m_id, marker_details) in self.seen_ids.items():
+            if marker_details['seen'] or marker_details['confidence'] < self.draw_confidence:
+                continue
+
+            x, y = marker_details['vertices'].mean(axis = 0)
+            if 0 <= x < w and 0 <= y < h:
+                yield m_id, marker_details
+
+    """
+    Function Name: step
+    Output: Advances all tracks to the next frame and removes the expired ones
+    Logic: Unseen tracks age by one frame, lose confidence and move by their average velocity.
+           Tracks older than max_age or below min_confidence are deleted, and so are the least recently seen unseen tracks
+           while there are more than max_tracks. All tracks are then marked unseen
+    Example Call: tracks.step()
+    """
+
+    def step(self):
+        expired = []
+        unseen = []
+
+        for (m_id, marker_details) in self.seen_ids.items():
+
+            if not marker_details['seen']:
+                # Increase time a marker is unseen for each frame it is unseen
+                marker_details['t'] += 1
+                marker_details['confidence'] *= self.decay
+
+                if marker_details['t'] >= self.max_age or marker_details['confidence'] < self.min_confidence:
+                    expired.append(m_id)
+                    continue
+                unseen.append(m_id)
+
+                # Estimate the position of vertices using its previous vertices and average velocity
+                marker_details['vertices'] = np.float32(marker_details['vertices'] + marker_details['av_velocity']).reshape(-1,2)
+
+                # Velocities are saved only if they are detected
+                marker_details['saved_velocities'] = np.zeros((0,4,2), dtype=np.float32)
+
+            # Mark all markers undetected by default. This will be updated if it is detected.
+            marker_details['seen'] = False
+
+        # A crowded frame may have left more than max_tracks tracks. The least recently seen unseen ones go first
+        overflow = len(self.seen_ids) - len(expired) - self.max_tracks
+        expired += unseen[:max(0, overflow)]
+
+        for m_id in expired:
+            del self.seen_ids[m_id]
+
+"""
+Function Name: square
+Output: Returns the vertices (4 x 2) of an axis aligned square
+Input: Top left corner x, y and side
+Example Call: marker = square(100, 50, 20)
+"""
+
+def square(x, y, side = 20):
+    return np.float32([(x, y), (x + side, y), (x + side, y + side), (x, y + side)])
+
+"""
+Function Name: self_check
+Output: Raises AssertionError if TrackManager misbehaves
+Logic: Checks constant velocity prediction, the jitter fallback, LRU eviction at max_tracks, that crowded frames keep every current track
+       and that a predicted track is no longer given by predicted() once it leaves the image
+Example Call: python tracker.py
+"""
+
+def self_check():
+    velocity = np.float32([3, 2])
+
+    # Constant velocity: once unseen, the track keeps moving by its average velocity
+    tracks = TrackManager()
+    for f in range(10):
+        tracks.update(np.float32([square(100, 100) + f * velocity]), [7])
+        tracks.step()
+    assert np.allclose(tracks[7]['av_velocity'], velocity)
+    for k in range(1, 4):
+        tracks.step()
+        assert np.allclose(tracks[7]['vertices'], square(100, 100) + (9 + k) * velocity)
+
+    # Jitter: a jump larger than jitter keeps the average velocity but takes the new position
+    jumped = square(100, 100) + 10 * velocity + 100
+    tracks.update(np.float32([jumped]), [7])
+    assert np.allclose(tracks[7]['av_velocity'], velocity)
+    assert np.allclose(tracks[7]['vertices'], jumped)
+
+    # LRU: the least recently seen track is evicted when max_tracks is exceeded
+    tracks = TrackManager(max_tracks = 3)
+    for m_id in (0, 1, 2, 0, 3):
+        tracks.update(np.float32([square(10 * m_id, 0)]), [m_id])
+        tracks.step()
+    assert list(tracks.seen_ids) == [2, 0, 3]
+
+    # Crowded frames: more current markers than max_tracks are all kept with their velocities,
+    # and the extra tracks are trimmed once they go unseen
+    tracks = TrackManager(max_tracks = 3)
+    for f in range(3):
+        tracks.update(np.float32([square(30 * m_id, 0) + f * velocity for m_id in range(5)]), list(range(5)))
+        assert len(tracks) == 5
+        tracks.step()
+    assert all(np.allclose(tracks[m_id]['av_velocity'], velocity) for m_id in range(5))
+    tracks.update(np.float32([square(0, 0), square(30, 0)]), [0, 1])
+    tracks.step()
+    assert list(tracks.seen_ids) == [4, 0, 1]
+
+    # Leaving the image: the prediction stops being drawn once its centre is outside
+    tracks = TrackManager(draw_confidence = 0.0)
+    for f in range(5):
+        tracks.update(np.float32([square(20 + 30 * f, 50)]), [1])
+        tracks.step()
+    drawn = []
+    for f in range(5):
+        drawn.append([m_id for (m_id, _) in tracks.predicted(200, 200)])
+        tracks.step()
+    assert drawn == [[1], [1], [], [], []] # Centre x is 150, 180, then 210 and beyond
+    assert 1 in tracks
+
+    print("TrackManager self-check passed")
+
+if __name__ == '__main__':
+    self_check()